@@ -4,7 +4,8 @@ Optional SDK for AuditFlow plugins.
 Plugins stay simple: a transformer module defines ``transform(input_data: dict) -> dict`` and a
 sink module defines ``process(event_data: dict, properties: dict) -> dict``. Everything here is
 *optional* — the registry surfaces it but never requires it. Existing bare-function modules keep
-working unchanged.
+working unchanged. A sink's ``process`` may also be ``async def``: the sink service awaits it on
+the event loop, while a plain function runs in a worker thread so blocking I/O never stalls it.
 
 Conventions the registry reads (all optional):
     __version__ = "1.0.0"                 # plugin version, shown in GET /registry
@@ -21,8 +22,26 @@ subclass one and bind the entry point at module level, e.g.::
 
     process = MySink().process   # the registry resolves the module-level callable
 """
+import gzip
+import json
+import threading
+import time
+import zlib
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Entry-point signatures (handy for type hints in bare-function modules).
 TransformFn = Callable[[Dict[str, Any]], Dict[str, Any]]
@@ -56,3 +75,206 @@ def require_properties(properties: Dict[str, Any], *required: str) -> None:
     missing = [key for key in required if not properties.get(key)]
     if missing:
         raise ValueError(f"Missing required propert{'y' if len(missing) == 1 else 'ies'}: {', '.join(missing)}")
+
+
+# Spellings accepted as "on" for boolean properties; the exact-match set covers the common case
+# without allocating a lowered copy of the value.
+_TRUE_VALUES = frozenset({"true", "True", "TRUE", "1", "yes", "on"})
+
+
+def is_true(properties: Dict[str, Any], key: str, default: Any = "false") -> bool:
+    """Read a boolean property. Pipeline properties usually arrive as strings from YAML."""
+    value = properties.get(key, default)
+    if isinstance(value, str):
+        return value in _TRUE_VALUES or value.strip().lower() in _TRUE_VALUES
+    return bool(value)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, compact or indented by two spaces.
+
+    Uses orjson when it is installed. Values orjson rejects — integers beyond 64 bits, non-string
+    keys — fall back to ``json.dumps``, so nothing the stdlib encoder accepts fails here.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except orjson.JSONEncodeError:
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Payload compression for object-storage sinks: algorithm -> (content type, file extension).
+COMPRESSION_FORMATS = {
+    "gzip": ("application/gzip", "gz"),
+    "zstd": ("application/zstd", "zst"),
+}
+
+# ZstdCompressor instances must not be shared between threads, and sinks run in a threadpool.
+_zstd_local = threading.local()
+
+
+def compression_setting(properties: Dict[str, Any]) -> str:
+    """Resolve the ``compression`` property (gzip/zstd/none), falling back to legacy ``compress``."""
+    legacy = "gzip" if is_true(properties, "compress") else "none"
+    algorithm = str(properties.get("compression", legacy)).lower()
+    if algorithm != "none" and algorithm not in COMPRESSION_FORMATS:
+        raise ValueError(f"Invalid compression '{algorithm}'. Must be one of: gzip, zstd, none")
+    if algorithm == "zstd" and zstandard is None:
+        raise RuntimeError("zstandard library is required for zstd compression. Install with: pip install zstandard")
+    return algorithm
+
+
+def compress_payload(data: Union[bytes, List[bytes]], algorithm: str, level: Optional[int] = None) -> bytes:
+    """Compress ``data`` with ``gzip`` (default level 9) or ``zstd`` (default level 3, multi-threaded).
+
+    ``data`` may also be a list of chunks (e.g. the NDJSON lines of a batch): they are fed to a
+    streaming compressor one by one, so the uncompressed concatenation is never materialized.
+    """
+    chunked = isinstance(data, list)
+    if algorithm == "gzip":
+        level = 9 if level is None else level
+        if not chunked:
+            return gzip.compress(data, compresslevel=level)
+        stream = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        return b"".join([stream.compress(chunk) for chunk in data] + [stream.flush()])
+    if algorithm == "zstd":
+        level = 3 if level is None else level
+        compressors = getattr(_zstd_local, "compressors", None)
+        if compressors is None:
+            compressors = _zstd_local.compressors = {}
+        compressor = compressors.get(level)
+        if compressor is None:
+            compressor = compressors[level] = zstandard.ZstdCompressor(level=level, threads=-1)
+        if not chunked:
+            return compressor.compress(data)
+        stream = compressor.compressobj()
+        return b"".join([stream.compress(chunk) for chunk in data] + [stream.flush()])
+    return b"".join(data) if chunked else data
+
+
+@lru_cache(maxsize=1024)
+def _key_time_parts(second: datetime, tzinfo, partition_format: Optional[str]) -> Tuple[Optional[str], str]:
+    # ``tzinfo`` is part of the key only: aware datetimes compare equal across offsets when they
+    # are the same instant, but they format in their own offset.
+    date_part = second.strftime(partition_format).rstrip('/') if partition_format else None
+    return date_part, second.strftime('%Y%m%d-%H%M%S')
+
+
+def key_time_parts(dt: datetime, partition_format: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """Return the (date partition, ``YYYYmmdd-HHMMSS``) pair used in object names.
+
+    Both strings only depend on the whole second, so they are memoized per second and format:
+    events arriving in the same second reuse the formatted parts instead of re-running strftime.
+    The parts are rendered in ``dt``'s own offset.
+    """
+    return _key_time_parts(dt.replace(microsecond=0), dt.tzinfo, partition_format)
+
+
+class _Slot:
+    """One submitted item waiting for the flush that carries it."""
+
+    __slots__ = ("item", "size", "ready", "done", "promoted", "result", "error")
+
+    def __init__(self, item: Any, size: int):
+        self.item = item
+        self.size = size
+        self.ready = threading.Event()
+        self.done = False
+        self.promoted = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class DeliveryCoalescer:
+    """
+    Group commit for sinks: concurrent deliveries to the same destination share one flush.
+
+    AuditFlow delivers one event per request, so a sink cannot buffer events across requests
+    without becoming stateful and losing them on restart — a success must mean "written". What it
+    *can* do is merge the deliveries that are in flight at the same moment. ``submit`` blocks
+    until the flush carrying its item has completed and returns that item's result (or raises the
+    flush's exception), so a batch never outlives the requests that fed it.
+
+    The first caller for a key becomes the leader: it optionally lingers, then flushes everything
+    queued for that key (bounded by ``max_items`` / ``max_bytes``) and repeats until its own item
+    is written. Items arriving during a flush queue up for the next one; when the leader is done,
+    leadership passes to the oldest waiter. Batch size therefore tracks delivery concurrency.
+
+    :param flush: ``flush(key, items) -> list`` writing ``items`` in one call and returning one
+                  result per item, in order.
+    """
+
+    def __init__(self, flush: Callable[[Hashable, List[Any]], List[Any]],
+                 max_items: int = 500, max_bytes: Optional[int] = None):
+        self._flush = flush
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, deque] = {}
+        self._leaders: set = set()
+
+    def submit(self, key: Hashable, item: Any, size: int = 0, linger: float = 0.0) -> Any:
+        """Queue ``item`` for ``key`` and block until it has been flushed; return its result."""
+        slot = _Slot(item, size)
+        with self._lock:
+            self._pending.setdefault(key, deque()).append(slot)
+            lead = key not in self._leaders
+            if lead:
+                self._leaders.add(key)
+
+        if not lead:
+            slot.ready.wait()
+            if not slot.promoted:
+                return slot.outcome()
+        elif linger > 0:
+            time.sleep(linger)
+
+        self._lead(key, slot)
+        return slot.outcome()
+
+    def _lead(self, key: Hashable, own: _Slot) -> None:
+        while not own.done:
+            self._run(key, self._take(key))
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue:
+                successor = queue[0]
+                successor.promoted = True
+                successor.ready.set()
+            else:
+                self._pending.pop(key, None)
+                self._leaders.discard(key)
+
+    def _take(self, key: Hashable) -> List[_Slot]:
+        with self._lock:
+            queue = self._pending[key]
+            batch = [queue.popleft()]
+            total = batch[0].size
+            while queue and len(batch) < self._max_items:
+                if self._max_bytes is not None and total + queue[0].size > self._max_bytes:
+                    break
+                total += queue[0].size
+                batch.append(queue.popleft())
+            return batch
+
+    def _run(self, key: Hashable, batch: List[_Slot]) -> None:
+        try:
+            results = self._flush(key, [slot.item for slot in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"flush returned {len(results)} results for {len(batch)} items")
+            for slot, result in zip(batch, results):
+                slot.result = result
+        except BaseException as exc:  # noqa: BLE001 - every caller in the batch gets the failure
+            for slot in batch:
+                slot.error = exc
+        for slot in batch:
+            slot.done = True
+            slot.ready.set()
@@ -64,11 +64,13 @@ class PluginRegistry:
         self.entry_point_group = entry_point_group
         self._plugins = {}   # id -> {"callable", "kind", "path", "module"}
         self._errors = {}    # id -> {"kind", "error"}
+        self._views = {}     # memoized list_available()/details() output, reset by discover()
 
     def discover(self):
         """(Re)scan every source and rebuild the allow-list. Returns self."""
         self._plugins = {}
         self._errors = {}
+        self._views = {}
 
         internal = [spec for spec in self.dir_specs if spec[1] == KIND_INTERNAL]
         external = [spec for spec in self.dir_specs if spec[1] != KIND_INTERNAL]
@@ -196,24 +198,43 @@ class PluginRegistry:
     def resolve(self, plugin_id):
         """Return the entry-point callable for an allow-listed plugin.
 
+        Hot path: every allow-listed id already passed ``VALID_ID`` at discovery, so a hit is a
+        single dict lookup; the id is only validated on a miss, to pick the error message.
+
         :raises PluginNotFoundError: if the id is malformed or not on the allow-list.
         """
+        entry = self._plugins.get(plugin_id)
+        if entry is not None:
+            return entry["callable"]
         if not plugin_id or not VALID_ID.fullmatch(plugin_id):
             raise PluginNotFoundError(f"invalid plugin id '{plugin_id}'")
-        entry = self._plugins.get(plugin_id)
-        if entry is None:
-            raise PluginNotFoundError(f"plugin '{plugin_id}' is not registered")
-        return entry["callable"]
+        raise PluginNotFoundError(f"plugin '{plugin_id}' is not registered")
 
     def list_available(self):
-        """List the allow-listed plugins (id, type, path)."""
-        return [
-            {"id": pid, "type": meta["kind"], "path": meta["path"]}
-            for pid, meta in sorted(self._plugins.items())
-        ]
+        """List the allow-listed plugins (id, type, path).
+
+        The allow-list only changes on :meth:`discover`, so the view is built once per discovery
+        and shared between calls — treat the returned list as read-only.
+        """
+        view = self._views.get("available")
+        if view is None:
+            view = self._views["available"] = [
+                {"id": pid, "type": meta["kind"], "path": meta["path"]}
+                for pid, meta in sorted(self._plugins.items())
+            ]
+        return view
 
     def details(self):
-        """Full registry view including optional SDK metadata (version, description, properties)."""
+        """Full registry view including optional SDK metadata (version, description, properties).
+
+        Memoized per discovery like :meth:`list_available`; treat the returned list as read-only.
+        """
+        view = self._views.get("details")
+        if view is None:
+            view = self._views["details"] = self._build_details()
+        return view
+
+    def _build_details(self):
         return [
             {
                 "id": pid,
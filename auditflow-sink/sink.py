@@ -1,8 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+import inspect
+import json
+import re
 import sys
 import os
 import logging
+import orjson
 
 from contextlib import asynccontextmanager
 from plugin_registry import PluginRegistry, PluginNotFoundError, VALID_ID
@@ -12,6 +17,30 @@ from health import set_ready, health, readiness, liveness, service_info, suppres
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 app_logger = logging.getLogger(__name__)
 
+
+# orjson turns integers outside 64 bits into floats. Any run of 19+ digits may be such a number;
+# bodies containing one are decoded with the stdlib parser instead, which keeps them exact.
+_LONG_DIGITS = re.compile(rb'\d{19,}')
+
+
+def _loads(body: bytes):
+    """Decode a JSON body with orjson, falling back to json.loads where orjson would lose precision."""
+    if _LONG_DIGITS.search(body):
+        return json.loads(body)
+    return orjson.loads(body)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson (FastAPI's own ORJSONResponse is deprecated)."""
+
+    def render(self, content) -> bytes:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. an integer outside 64 bits carried through from the request: keep it exact
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Set service as ready after startup completes."""
@@ -34,7 +63,8 @@ app = FastAPI(
         "url": "https://raw.githubusercontent.com/Labs64/labs64.io-auditflow/refs/heads/master/LICENSE",
     },
     swagger_ui_parameters={"displayRequestDuration": True},
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=OrjsonResponse
 )
 
 # Health check endpoints
@@ -74,10 +104,29 @@ registry = PluginRegistry(
 ).discover()
 
 
-@app.post('/sink/{sink_id}')
+# The body is parsed by hand with orjson (see sink()); this keeps the documented request schema.
+SINK_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "event_data": {"type": "object", "description": "Transformed audit event"},
+                        "properties": {"type": "object", "description": "Sink-specific configuration"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+@app.post('/sink/{sink_id}', openapi_extra=SINK_REQUEST_SCHEMA)
 async def sink(
         sink_id: str,
-        request_body: dict
+        request: Request
 ):
     """
     Send transformed audit events to a destination sink.
@@ -85,7 +134,12 @@ async def sink(
     The sink is resolved from the startup allow-list (modules shipped in 'sinks/' or mounted in
     'sinks_bootstrap/'). An id that is not on the allow-list returns 404 and is never imported.
 
-    The sink module must provide a 'process(event_data, properties)' function.
+    The raw body is decoded once with orjson instead of going through FastAPI's generic 'dict'
+    validation; a body that is not a JSON object returns 422.
+
+    The sink module must provide a 'process(event_data, properties)' function. A plain function
+    runs in a worker thread so blocking network I/O never stalls the event loop; an
+    'async def process' is awaited on the loop directly.
 
     Returns:
     - Success response with sink processing details
@@ -107,6 +161,13 @@ async def sink(
                 detail=f"Sink '{sink_id}' is not available. See GET /sinks for the registered sinks."
             )
 
+        try:
+            request_body = _loads(await request.body())
+        except ValueError as e:  # orjson.JSONDecodeError and json.JSONDecodeError both subclass it
+            raise HTTPException(status_code=422, detail=f"Request body is not valid JSON: {e}")
+        if not isinstance(request_body, dict):
+            raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+
         event_data = request_body.get("event_data", {})
         properties = request_body.get("properties", {})
 
@@ -114,11 +175,14 @@ async def sink(
         event_id = event_data.get("eventId", "unknown")
         app_logger.info("Processing event '%s' type='%s' through sink '%s'",
                         event_id, event_data.get("eventType", ""), sink_id)
-        result = process_function(event_data, properties)
+        if inspect.iscoroutinefunction(process_function):
+            result = await process_function(event_data, properties)
+        else:
+            result = await run_in_threadpool(process_function, event_data, properties)
         business_telemetry.sink_completed(sink_id, True)
 
         # Return success response
-        return JSONResponse(
+        return OrjsonResponse(
             content={
                 "status": "success",
                 "sink": sink_id,
@@ -143,7 +207,7 @@ async def sink(
 @app.get('/registry')
 async def registry_details():
     """Detailed registry view: per-sink version, description, and documented properties. Also doubles as the container healthcheck."""
-    return JSONResponse(
+    return OrjsonResponse(
         content={"sinks": registry.details(), "errors": registry.errors()},
         status_code=200
     )
@@ -153,7 +217,7 @@ async def registry_details():
 async def registry_reload():
     """Re-scan the sink directories (hot-reload of newly mounted bootstrap modules)."""
     registry.reload()
-    return JSONResponse(
+    return OrjsonResponse(
         content={"reloaded": True, "count": len(registry.list_available()), "errors": registry.errors()},
         status_code=200
     )
@@ -2,10 +2,17 @@
 AWS CloudWatch Logs Sink - Send events to AWS CloudWatch Logs.
 
 This sink sends audit events to CloudWatch Logs for centralized logging and monitoring.
+
+With ``batch: true`` concurrent deliveries to the same log stream are coalesced into one
+put_log_events call (up to the API's 10,000 events / 1 MiB per call). Every delivery still waits for
+the call that carries its event, so a success means the event was accepted by CloudWatch — see
+DeliveryCoalescer. Events over the per-event size limit are rejected before they can join a call.
 """
 import logging
-import json
 import time
+from functools import lru_cache
+
+from auditflow_sdk import DeliveryCoalescer, dumps, is_true
 
 __version__ = "1.0.0"
 
@@ -17,6 +24,10 @@ PROPERTIES = {
     "secret-access-key": "AWS secret access key (optional)",
     "create-log-group": "Auto-create log group if missing: true/false (default: true)",
     "create-log-stream": "Auto-create log stream if missing: true/false (default: true)",
+    "batch": "Share one put_log_events call between concurrent deliveries to the same stream: "
+             "true/false (default: false)",
+    "batch-linger-ms": "With batch, extra time the first delivery waits for concurrent ones to join "
+                       "its put_log_events call (default: 0 — batch only what is already in flight)",
 }
 
 logger = logging.getLogger(__name__)
@@ -28,6 +39,11 @@ except ImportError:
     logger.error("boto3 is not installed. Install with: pip install boto3")
     boto3 = None
 
+# (region, access-key-id, log group, log stream) destinations already verified or created by this
+# process. Log groups and streams are long-lived, so after the first event the existence checks
+# are skipped and a delivery is a single put_log_events call.
+_known_streams: set = set()
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -43,6 +59,8 @@ def process(event_data: dict, properties: dict) -> dict:
             - secret-access-key: AWS secret key (optional)
             - create-log-group: Auto-create log group if not exists (default: true)
             - create-log-stream: Auto-create log stream if not exists (default: true)
+            - batch: Share put_log_events calls between concurrent deliveries (default: false)
+            - batch-linger-ms: Wait for concurrent deliveries to join the call (default: 0)
 
     Returns:
         dict: Processing result with CloudWatch details
@@ -60,43 +78,42 @@ def process(event_data: dict, properties: dict) -> dict:
     region = properties.get('region', 'us-east-1')
     access_key_id = properties.get('access-key-id')
     secret_access_key = properties.get('secret-access-key')
-    create_log_group = properties.get('create-log-group', 'true').lower() == 'true'
-    create_log_stream = properties.get('create-log-stream', 'true').lower() == 'true'
+    create_log_group = is_true(properties, 'create-log-group', 'true')
+    create_log_stream = is_true(properties, 'create-log-stream', 'true')
+    batch = is_true(properties, 'batch', 'false')
+    linger = int(properties.get('batch-linger-ms', '0')) / 1000
 
-    # Create CloudWatch Logs client
-    session_kwargs = {'region_name': region}
-    if access_key_id and secret_access_key:
-        session_kwargs['aws_access_key_id'] = access_key_id
-        session_kwargs['aws_secret_access_key'] = secret_access_key
+    # Reuse the CloudWatch Logs client (and its connection pool) across events
+    logs_client = _get_client(region, access_key_id, secret_access_key)
 
-    logs_client = boto3.client('logs', **session_kwargs)
+    destination = (region, access_key_id, log_group, log_stream)
 
     try:
-        # Ensure log group exists
-        if create_log_group:
-            ensure_log_group(logs_client, log_group)
-
-        # Ensure log stream exists
-        if create_log_stream:
-            ensure_log_stream(logs_client, log_group, log_stream)
-
         # Prepare log event
         timestamp = int(time.time() * 1000)  # milliseconds
-        message = json.dumps(event_data)
-
-        # Put log event
+        message = dumps(event_data)
+        log_event = {'timestamp': timestamp, 'message': message.decode()}
+        size = len(message) + _EVENT_OVERHEAD_BYTES
+        if size > MAX_EVENT_BYTES:
+            # put_log_events would reject the whole call, failing every event batched with it
+            raise ValueError(f"Event is {size} bytes; CloudWatch Logs accepts at most "
+                             f"{MAX_EVENT_BYTES} bytes per event")
+
+        # Put log event; with batch, the call is shared with concurrent deliveries to the same stream
         logger.info("Sending event to CloudWatch Logs: %s/%s", log_group, log_stream)
 
-        response = logs_client.put_log_events(
-            logGroupName=log_group,
-            logStreamName=log_stream,
-            logEvents=[
-                {
-                    'timestamp': timestamp,
-                    'message': message
-                }
-            ]
-        )
+        try:
+            batch_size = _deliver(logs_client, destination, create_log_group, create_log_stream,
+                                  log_event, size, batch, linger)
+        except ClientError as e:
+            # A cached group/stream was deleted since it was first seen: forget it and recreate once
+            if (e.response['Error']['Code'] != 'ResourceNotFoundException'
+                    or not (create_log_group or create_log_stream)):
+                raise
+            logger.warning("Log stream %s/%s disappeared, recreating it", log_group, log_stream)
+            _known_streams.discard(destination)
+            batch_size = _deliver(logs_client, destination, create_log_group, create_log_stream,
+                                  log_event, size, batch, linger)
 
         logger.info("Event sent to CloudWatch Logs successfully")
 
@@ -105,7 +122,8 @@ def process(event_data: dict, properties: dict) -> dict:
             "destination": "cloudwatch",
             "log_group": log_group,
             "log_stream": log_stream,
-            "region": region
+            "region": region,
+            "batch_size": batch_size
         }
 
     except ClientError as e:
@@ -113,23 +131,76 @@ def process(event_data: dict, properties: dict) -> dict:
         error_message = e.response['Error']['Message']
         logger.error("Failed to send to CloudWatch Logs: %s - %s", error_code, error_message)
         raise RuntimeError(f"Failed to send to CloudWatch Logs: {error_code} - {error_message}")
+    except ValueError:
+        raise
     except Exception as e:
         logger.error("Unexpected error sending to CloudWatch Logs: %s", e)
         raise RuntimeError(f"Unexpected error: {e}")
 
 
+def _deliver(logs_client, destination: tuple, create_log_group: bool, create_log_stream: bool,
+             log_event: dict, size: int, batch: bool, linger: float) -> int:
+    """Ensure the group/stream on first use, then put the event (through the shared put with batch)."""
+    _, _, log_group, log_stream = destination
+    if destination not in _known_streams:
+        # Ensure log group exists
+        if create_log_group:
+            ensure_log_group(logs_client, log_group)
+
+        # Ensure log stream exists
+        if create_log_stream:
+            ensure_log_stream(logs_client, log_group, log_stream)
+
+        _known_streams.add(destination)
+
+    key = (logs_client, log_group, log_stream)
+    if not batch:
+        return _put_batch(key, [log_event])[0]
+    return _coalescer.submit(key, log_event, size=size, linger=linger)
+
+
+def _put_batch(key, log_events: list) -> list:
+    """Write one coalesced batch; every event in it reports the batch size."""
+    client, log_group, log_stream = key
+    # put_log_events requires chronological order within a call
+    log_events.sort(key=lambda log_event: log_event['timestamp'])
+    client.put_log_events(logGroupName=log_group, logStreamName=log_stream, logEvents=log_events)
+    return [len(log_events)] * len(log_events)
+
+
+# put_log_events limits: 10,000 events and 1,048,576 bytes (message bytes + 26 per event) per call,
+# and 262,144 bytes per event.
+_EVENT_OVERHEAD_BYTES = 26
+MAX_EVENT_BYTES = 262_144
+_coalescer = DeliveryCoalescer(_put_batch, max_items=10_000, max_bytes=1_048_576)
+
+
+@lru_cache(maxsize=32)
+def _get_client(region: str, access_key_id, secret_access_key):
+    """
+    Return a cached CloudWatch Logs client for the given configuration.
+
+    boto3 clients are thread-safe and expensive to build (service model load, new connection
+    pool), so one per configuration is shared by all deliveries.
+    """
+    client_kwargs = {'region_name': region}
+    if access_key_id and secret_access_key:
+        client_kwargs['aws_access_key_id'] = access_key_id
+        client_kwargs['aws_secret_access_key'] = secret_access_key
+    # A private Session per client: creating clients from boto3's shared default session is not
+    # thread-safe, and first deliveries for a configuration may build clients concurrently.
+    return boto3.session.Session().client('logs', **client_kwargs)
+
+
 def ensure_log_group(client, log_group: str):
-    """Ensure log group exists, create if it doesn't."""
-    try:
-        response = client.describe_log_groups(logGroupNamePrefix=log_group)
-        log_groups = response.get('logGroups', [])
-        exists = any(lg['logGroupName'] == log_group for lg in log_groups)
+    """Ensure log group exists, create if it doesn't.
 
-        if exists:
-            logger.debug("Log group '%s' already exists", log_group)
-        else:
-            logger.info("Creating log group: %s", log_group)
-            client.create_log_group(logGroupName=log_group)
+    Creates unconditionally and treats ResourceAlreadyExistsException as success: one call
+    instead of a describe (which may page through many prefix matches) followed by a create.
+    """
+    try:
+        client.create_log_group(logGroupName=log_group)
+        logger.info("Created log group: %s", log_group)
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceAlreadyExistsException':
             logger.debug("Log group '%s' already exists", log_group)
@@ -138,23 +209,13 @@ def ensure_log_group(client, log_group: str):
 
 
 def ensure_log_stream(client, log_group: str, log_stream: str):
-    """Ensure log stream exists, create if it doesn't."""
+    """Ensure log stream exists, create if it doesn't (same create-and-swallow approach)."""
     try:
-        response = client.describe_log_streams(
+        client.create_log_stream(
             logGroupName=log_group,
-            logStreamNamePrefix=log_stream
+            logStreamName=log_stream
         )
-        log_streams = response.get('logStreams', [])
-        exists = any(ls['logStreamName'] == log_stream for ls in log_streams)
-
-        if exists:
-            logger.debug("Log stream '%s' already exists", log_stream)
-        else:
-            logger.info("Creating log stream: %s", log_stream)
-            client.create_log_stream(
-                logGroupName=log_group,
-                logStreamName=log_stream
-            )
+        logger.info("Created log stream: %s", log_stream)
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceAlreadyExistsException':
             logger.debug("Log stream '%s' already exists", log_stream)
@@ -3,12 +3,20 @@ AWS S3 Sink - Store events in Amazon S3.
 
 This sink uploads audit events to AWS S3 as JSON objects.
 Supports batching, compression, and partitioning by date.
+
+With ``batch: true`` (jsonl or msgpack only) concurrent deliveries that land in the same partition
+are written as one NDJSON / MessagePack-stream object, compressed once. Each delivery still waits
+for the PUT that carries its event, so nothing is buffered across requests — see
+DeliveryCoalescer.
 """
+import io
 import logging
-import json
-import gzip
 from datetime import datetime, timezone
-import uuid
+from functools import lru_cache
+from typing import NamedTuple, Optional
+import secrets
+
+from auditflow_sdk import COMPRESSION_FORMATS, DeliveryCoalescer, compress_payload, compression_setting, dumps, is_true, key_time_parts
 
 __version__ = "1.0.0"
 
@@ -18,22 +26,33 @@ PROPERTIES = {
     "region": "AWS region (default: us-east-1)",
     "access-key-id": "AWS access key ID (optional, uses default credential chain if omitted)",
     "secret-access-key": "AWS secret access key (optional)",
-    "compress": "Enable gzip compression: true/false (default: false)",
+    "compress": "Enable gzip compression: true/false (default: false; superseded by compression)",
+    "compression": "Payload compression: gzip, zstd or none (default: gzip if compress is true, else none)",
     "partition-by-date": "Partition objects by event date: true/false (default: true)",
     "partition-format": "strftime pattern for date partitioning (default: year=%Y/month=%m/day=%d/)",
-    "file-format": "File format: json or jsonl (default: json)",
+    "file-format": "File format: json, jsonl or msgpack (default: json)",
     "endpoint-url": "Custom S3-compatible endpoint URL (optional)",
+    "batch": "Write concurrent deliveries to the same partition as one object: true/false "
+             "(default: false; requires file-format jsonl or msgpack)",
+    "batch-linger-ms": "Extra time the first delivery waits for concurrent ones to join its "
+                       "object (default: 0 — batch only what is already in flight)",
 }
 
 logger = logging.getLogger(__name__)
 
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
     from botocore.exceptions import ClientError
 except ImportError:
     logger.error("boto3 is not installed. Install with: pip install boto3")
     boto3 = None
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -48,10 +67,13 @@ def process(event_data: dict, properties: dict) -> dict:
             - access-key-id: AWS access key (optional, uses default credentials if not provided)
             - secret-access-key: AWS secret key (optional)
             - compress: Enable gzip compression (default: false)
+            - compression: gzip, zstd or none (default: derived from compress)
             - partition-by-date: Partition by date (default: true)
             - partition-format: Date format for partitioning (default: year=%Y/month=%m/day=%d/)
-            - file-format: File format - json or jsonl (default: json)
+            - file-format: File format - json, jsonl or msgpack (default: json)
             - endpoint-url: Custom S3 endpoint URL (optional, for S3-compatible storage)
+            - batch: Write concurrent deliveries as one object (default: false)
+            - batch-linger-ms: Wait for concurrent deliveries to join the object (default: 0)
 
     Returns:
         dict: Processing result with S3 details
@@ -59,90 +81,67 @@ def process(event_data: dict, properties: dict) -> dict:
     if boto3 is None:
         raise RuntimeError("boto3 library is required. Install with: pip install boto3")
 
-    # Validate required properties
-    bucket = properties.get('bucket')
-    if not bucket:
-        raise ValueError("Missing required property: 'bucket'")
-
-    # Get configuration
-    prefix = properties.get('prefix', 'auditflow/')
-    region = properties.get('region', 'us-east-1')
-    access_key_id = properties.get('access-key-id')
-    secret_access_key = properties.get('secret-access-key')
-    compress = properties.get('compress', 'false').lower() == 'true'
-    partition_by_date = properties.get('partition-by-date', 'true').lower() == 'true'
-    partition_format = properties.get('partition-format', 'year=%Y/month=%m/day=%d/')
-    file_format = properties.get('file-format', 'json').lower()
-    endpoint_url = properties.get('endpoint-url')
-
-    # Create S3 client
-    session_kwargs = {'region_name': region}
-    if access_key_id and secret_access_key:
-        session_kwargs['aws_access_key_id'] = access_key_id
-        session_kwargs['aws_secret_access_key'] = secret_access_key
+    # Properties are static per route: parse and validate them once per distinct configuration
+    config = _parse_config(properties)
+    bucket, region, compression, file_format = config.bucket, config.region, config.compression, config.file_format
 
-    if endpoint_url:
-        s3_client = boto3.client('s3', endpoint_url=endpoint_url, **session_kwargs)
-    else:
-        s3_client = boto3.client('s3', **session_kwargs)
+    # Reuse the S3 client (and its connection pool) across events with the same configuration
+    s3_client = _get_client(region, config.endpoint_url, config.access_key_id, config.secret_access_key)
 
     # Build object key
     object_key = build_object_key(
-        prefix,
-        partition_by_date,
-        partition_format,
+        config.prefix,
+        config.partition_by_date,
+        config.partition_format,
         file_format,
-        compress,
+        compression,
         event_data
     )
 
-    # Prepare content
-    if file_format == 'jsonl':
-        content = json.dumps(event_data) + '\n'
-    else:
-        content = json.dumps(event_data, indent=2)
-
-    # Compress if needed
-    if compress:
-        content_bytes = gzip.compress(content.encode('utf-8'))
-        content_type = 'application/gzip'
+    # Prepare content — dumps emits UTF-8 bytes directly, no separate encode pass
+    if file_format == 'msgpack':
+        if msgspec is None:
+            raise RuntimeError("msgspec library is required for file-format 'msgpack'. Install with: pip install msgspec")
+        content_bytes = msgspec.msgpack.encode(event_data)
+        content_type = 'application/x-msgpack'
+    elif file_format == 'jsonl':
+        content_bytes = dumps(event_data) + b'\n'
+        content_type = 'application/json'
     else:
-        content_bytes = content.encode('utf-8')
+        content_bytes = dumps(event_data, indent=True)
         content_type = 'application/json'
 
     try:
-        # Upload to S3
-        logger.info("Uploading event to S3: s3://%s/%s", bucket, object_key)
-
-        response = s3_client.put_object(
-            Bucket=bucket,
-            Key=object_key,
-            Body=content_bytes,
-            ContentType=content_type,
-            Metadata={
-                'timestamp': event_data.get('timestamp', datetime.now(timezone.utc).isoformat()),
+        if config.batch:
+            # Share one object with concurrent deliveries to the same partition
+            key_dir = object_key.rpartition('/')[0]
+            logger.info("Uploading event to S3 batch: s3://%s/%s/", bucket, key_dir)
+            upload = _coalescer.submit(
+                (s3_client, bucket, key_dir, content_type, compression),
+                (object_key, content_bytes),
+                size=len(content_bytes),
+                linger=config.linger
+            )
+        else:
+            logger.info("Uploading event to S3: s3://%s/%s", bucket, object_key)
+            upload = _upload(s3_client, bucket, object_key, content_bytes, content_type, compression, {
+                'timestamp': event_data.get('timestamp') or datetime.now(timezone.utc).isoformat(),
                 'event-id': event_data.get('eventId', 'unknown'),
                 'event-type': event_data.get('eventType', 'unknown'),
                 'source-system': event_data.get('sourceSystem', 'unknown'),
                 'tenant-id': event_data.get('tenantId', 'unknown'),
-            }
-        )
+            })
 
-        logger.info("Event uploaded to S3 successfully. ETag: %s", response.get('ETag'))
-
-        # Strip quotes from ETag (AWS returns ETags wrapped in quotes)
-        etag = response.get('ETag', '').strip('"')
+        logger.info("Event uploaded to S3 successfully. ETag: %s", upload['etag'])
 
         return {
             "sent": True,
             "destination": "s3",
             "bucket": bucket,
-            "key": object_key,
             "region": region,
-            "compressed": compress,
-            "size_bytes": len(content_bytes),
-            "etag": etag,
-            "version_id": response.get('VersionId')
+            "compressed": compression != 'none',
+            "compression": compression,
+            **upload
         }
 
     except ClientError as e:
@@ -155,12 +154,158 @@ def process(event_data: dict, properties: dict) -> dict:
         raise RuntimeError(f"Unexpected error: {e}")
 
 
+class _S3Config(NamedTuple):
+    bucket: str
+    prefix: str
+    region: str
+    access_key_id: Optional[str]
+    secret_access_key: Optional[str]
+    compression: str
+    partition_by_date: bool
+    partition_format: str
+    file_format: str
+    endpoint_url: Optional[str]
+    batch: bool
+    linger: float
+
+
+def _parse_config(properties: dict) -> _S3Config:
+    """Return the parsed configuration, memoized on the (hashable) property items."""
+    try:
+        key = frozenset(properties.items())
+    except TypeError:
+        # Non-scalar property values cannot be a cache key; parse without caching
+        return _build_config.__wrapped__(properties.items())
+    return _build_config(key)
+
+
+@lru_cache(maxsize=64)
+def _build_config(items) -> _S3Config:
+    properties = dict(items)
+
+    # Validate required properties
+    bucket = properties.get('bucket')
+    if not bucket:
+        raise ValueError("Missing required property: 'bucket'")
+
+    file_format = properties.get('file-format', 'json').lower()
+    batch = is_true(properties, 'batch', 'false')
+    if batch and file_format not in ('jsonl', 'msgpack'):
+        raise ValueError("Property 'batch' requires file-format 'jsonl' or 'msgpack'")
+
+    return _S3Config(
+        bucket=bucket,
+        prefix=properties.get('prefix', 'auditflow/'),
+        region=properties.get('region', 'us-east-1'),
+        access_key_id=properties.get('access-key-id'),
+        secret_access_key=properties.get('secret-access-key'),
+        compression=compression_setting(properties),
+        partition_by_date=is_true(properties, 'partition-by-date', 'true'),
+        partition_format=properties.get('partition-format', 'year=%Y/month=%m/day=%d/'),
+        file_format=file_format,
+        endpoint_url=properties.get('endpoint-url'),
+        batch=batch,
+        linger=int(properties.get('batch-linger-ms', '0')) / 1000,
+    )
+
+
+# Objects at or above this size are uploaded as concurrent multipart uploads
+_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=_MULTIPART_THRESHOLD, max_concurrency=8) if boto3 is not None else None
+
+
+def _upload(s3_client, bucket: str, object_key: str, content, content_type: str,
+            compression: str, metadata: dict) -> dict:
+    """Compress (if enabled) and PUT one object; return the key/size/etag part of the result.
+
+    ``content`` is the payload bytes, or a list of chunks (a batch) compressed as a stream.
+    """
+    content_bytes = compress_payload(content, compression)
+    if compression != 'none':
+        content_type = COMPRESSION_FORMATS[compression][0]
+
+    if len(content_bytes) >= _MULTIPART_THRESHOLD:
+        # Large batches go through the transfer manager: parts are uploaded concurrently and
+        # retried individually instead of re-sending the whole object on a failed PUT
+        s3_client.upload_fileobj(
+            io.BytesIO(content_bytes), bucket, object_key,
+            ExtraArgs={'ContentType': content_type, 'Metadata': metadata},
+            Config=_TRANSFER_CONFIG
+        )
+        # upload_fileobj returns nothing; read back the ETag/VersionId so the result keeps its shape
+        response = s3_client.head_object(Bucket=bucket, Key=object_key)
+    else:
+        response = s3_client.put_object(
+            Bucket=bucket,
+            Key=object_key,
+            Body=content_bytes,
+            ContentType=content_type,
+            Metadata=metadata
+        )
+
+    return {
+        "key": object_key,
+        "size_bytes": len(content_bytes),
+        # Strip quotes from ETag (AWS returns ETags wrapped in quotes)
+        "etag": response.get('ETag', '').strip('"') or None,
+        "version_id": response.get('VersionId')
+    }
+
+
+def _upload_batch(key, items: list) -> list:
+    """Write one coalesced batch as a single object named after its first event."""
+    s3_client, bucket, _, content_type, compression = key
+    object_key = items[0][0]
+    upload = _upload(
+        s3_client, bucket, object_key, [content for _, content in items],
+        content_type, compression, {'event-count': str(len(items))}
+    )
+    upload['batch_size'] = len(items)
+    return [upload] * len(items)
+
+
+_coalescer = DeliveryCoalescer(_upload_batch, max_items=1_000, max_bytes=8 * 1024 * 1024)
+
+
+@lru_cache(maxsize=32)
+def _get_client(region: str, endpoint_url, access_key_id, secret_access_key):
+    """
+    Return a cached S3 client for the given configuration.
+
+    Building a boto3 client loads the service model and opens a fresh connection pool, which
+    costs far more than the upload itself; boto3 clients are thread-safe, so one per
+    configuration is shared by all deliveries.
+    """
+    client_kwargs = {'region_name': region}
+    if access_key_id and secret_access_key:
+        client_kwargs['aws_access_key_id'] = access_key_id
+        client_kwargs['aws_secret_access_key'] = secret_access_key
+    if endpoint_url:
+        client_kwargs['endpoint_url'] = endpoint_url
+    # A private Session per client: creating clients from boto3's shared default session is not
+    # thread-safe, and first deliveries for a configuration may build clients concurrently.
+    return boto3.session.Session().client('s3', **client_kwargs)
+
+
+@lru_cache(maxsize=128)
+def _event_time(event_timestamp: str) -> Optional[datetime]:
+    """
+    Parse an ISO-8601 event timestamp, or None if it is malformed. Bursts of events share the
+    same timestamp string, so parsed (immutable) datetimes are cached per string.
+    """
+    try:
+        return datetime.fromisoformat(event_timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
 def build_object_key(
     prefix: str,
     partition_by_date: bool,
     partition_format: str,
     file_format: str,
-    compress: bool,
+    compression: str,
     event_data: dict
 ) -> str:
     """Build S3 object key with optional tenantId and date partitioning."""
@@ -173,29 +318,24 @@ def build_object_key(
 
     # Parse timestamp from event_data if exists, otherwise use current timestamp
     event_timestamp = event_data.get('timestamp')
-    if event_timestamp:
-        try:
-            if isinstance(event_timestamp, str):
-                dt = datetime.fromisoformat(event_timestamp.replace('Z', '+00:00'))
-            else:
-                dt = datetime.now(timezone.utc)
-        except (ValueError, AttributeError):
-            dt = datetime.now(timezone.utc)
-    else:
+    dt = _event_time(event_timestamp) if event_timestamp and isinstance(event_timestamp, str) else None
+    if dt is None:
         dt = datetime.now(timezone.utc)
 
     # Add date partition using the event timestamp
-    if partition_by_date:
-        date_part = dt.strftime(partition_format)
-        key_parts.append(date_part.rstrip('/'))
+    date_part, timestamp = key_time_parts(dt, partition_format if partition_by_date else None)
+    if date_part is not None:
+        key_parts.append(date_part)
 
     # Generate unique filename using the event timestamp
-    event_id = event_data.get('eventId', str(uuid.uuid4()))
-    timestamp = dt.strftime('%Y%m%d-%H%M%S')
+    event_id = event_data.get('eventId')
+    if event_id is None:
+        # Only 8 characters end up in the name; draw just those instead of a full UUID.
+        event_id = secrets.token_hex(4)
 
-    extension = 'json'
-    if compress:
-        extension += '.gz'
+    extension = 'msgpack' if file_format == 'msgpack' else 'json'
+    if compression != 'none':
+        extension += '.' + COMPRESSION_FORMATS[compression][1]
 
     filename = f"{timestamp}-{event_id[:8]}.{extension}"
     key_parts.append(filename)
@@ -4,10 +4,12 @@ Azure Blob Storage Sink - Store events in Azure Blob Storage.
 This sink uploads audit events to Azure Blob Storage as JSON objects.
 """
 import logging
-import json
-import gzip
 from datetime import datetime, timezone
-import uuid
+import secrets
+from functools import lru_cache
+from typing import Optional
+
+from auditflow_sdk import COMPRESSION_FORMATS, compress_payload, compression_setting, dumps, is_true, key_time_parts
 
 __version__ = "1.0.0"
 
@@ -17,21 +19,35 @@ PROPERTIES = {
     "account-name": "Storage account name (required if not using connection-string)",
     "account-key": "Storage account key (required if not using connection-string)",
     "prefix": "Blob prefix/folder (default: auditflow/)",
-    "compress": "Enable gzip compression: true/false (default: false)",
+    "compress": "Enable gzip compression: true/false (default: false; superseded by compression)",
+    "compression": "Payload compression: gzip, zstd or none (default: gzip if compress is true, else none)",
     "partition-by-date": "Partition blobs by date: true/false (default: true)",
     "partition-format": "strftime pattern for date partitioning (default: year=%Y/month=%m/day=%d/)",
-    "content-type": "Content-Type for the uploaded blob (default: application/json)",
+    "file-format": "File format: json or msgpack (default: json)",
+    "content-type": "Content-Type for the uploaded blob (default: application/json, or application/x-msgpack for msgpack)",
 }
 
 logger = logging.getLogger(__name__)
 
 try:
     from azure.storage.blob import BlobServiceClient, ContentSettings
-    from azure.core.exceptions import AzureError
+    from azure.core.exceptions import AzureError, ResourceExistsError
 except ImportError:
     logger.error("azure-storage-blob is not installed. Install with: pip install azure-storage-blob")
     BlobServiceClient = None
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Parallel block uploads for blobs larger than the single-put size
+_MAX_CONCURRENCY = 8
+
+# Containers known to exist, keyed by (connection-string, account-name, container), for the life
+# of the process: after the first event a delivery is just the blob upload.
+_known_containers: set = set()
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -46,9 +62,11 @@ def process(event_data: dict, properties: dict) -> dict:
             - account-key: Storage account key (required if using account-key)
             - prefix: Blob prefix/folder (default: auditflow/)
             - compress: Enable gzip compression (default: false)
+            - compression: gzip, zstd or none (default: derived from compress)
             - partition-by-date: Partition by date (default: true)
             - partition-format: Date format for partitioning (default: year=%Y/month=%m/day=%d/)
-            - content-type: Content type (default: application/json)
+            - file-format: File format - json or msgpack (default: json)
+            - content-type: Content type (default: application/json, or application/x-msgpack for msgpack)
 
     Returns:
         dict: Processing result with Azure Blob Storage details
@@ -71,48 +89,54 @@ def process(event_data: dict, properties: dict) -> dict:
 
     # Get configuration
     prefix = properties.get('prefix', 'auditflow/')
-    compress = properties.get('compress', 'false').lower() == 'true'
-    partition_by_date = properties.get('partition-by-date', 'true').lower() == 'true'
+    compression = compression_setting(properties)
+    partition_by_date = is_true(properties, 'partition-by-date', 'true')
     partition_format = properties.get('partition-format', 'year=%Y/month=%m/day=%d/')
-    content_type = properties.get('content-type', 'application/json')
+    file_format = properties.get('file-format', 'json').lower()
+    content_type = properties.get(
+        'content-type', 'application/x-msgpack' if file_format == 'msgpack' else 'application/json')
 
-    # Create Blob Service Client
-    if connection_string:
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-    else:
-        account_url = f"https://{account_name}.blob.core.windows.net"
-        blob_service_client = BlobServiceClient(
-            account_url=account_url,
-            credential=account_key
-        )
+    if file_format == 'msgpack' and msgspec is None:
+        raise RuntimeError("msgspec library is required for file-format 'msgpack'. Install with: pip install msgspec")
+
+    # Reuse the Blob Service Client (and its connection pool) across events with the same account
+    blob_service_client = _get_client(connection_string, account_name, account_key)
+    destination = (connection_string, account_name, container_name)
 
     try:
         # Get container client
         container_client = blob_service_client.get_container_client(container_name)
 
-        # Ensure container exists
-        if not container_client.exists():
-            logger.info("Creating container: %s", container_name)
-            container_client.create_container()
+        # Ensure container exists (once per process and container)
+        if destination not in _known_containers:
+            ensure_container(container_client, container_name)
+            _known_containers.add(destination)
+
+        # One clock read per event, shared by the blob name and the metadata timestamp
+        now = datetime.now(timezone.utc)
 
         # Build blob name
         blob_name = build_blob_name(
             prefix,
             partition_by_date,
             partition_format,
-            compress,
-            event_data
+            compression,
+            event_data,
+            file_format,
+            now
         )
 
-        # Prepare content
-        content = json.dumps(event_data, indent=2)
+        # Prepare content — dumps emits UTF-8 bytes directly, no separate encode pass
+        if file_format == 'msgpack':
+            content_bytes = msgspec.msgpack.encode(event_data)
+        else:
+            content_bytes = dumps(event_data, indent=True)
 
         # Compress if needed
-        if compress:
-            content_bytes = gzip.compress(content.encode('utf-8'))
-            final_content_type = 'application/gzip'
+        if compression != 'none':
+            content_bytes = compress_payload(content_bytes, compression)
+            final_content_type = COMPRESSION_FORMATS[compression][0]
         else:
-            content_bytes = content.encode('utf-8')
             final_content_type = content_type
 
         # Get blob client
@@ -122,36 +146,39 @@ def process(event_data: dict, properties: dict) -> dict:
         metadata = {
             'event_type': event_data.get('eventType', 'unknown'),
             'source_system': event_data.get('sourceSystem', 'unknown'),
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now.isoformat()
         }
 
         # Upload
         logger.info("Uploading event to Azure Blob Storage: %s/%s", container_name, blob_name)
 
-        blob_client.upload_blob(
+        # Blobs above the SDK's single-put limit are staged as blocks in parallel;
+        # the upload response already carries etag/last_modified, no extra properties call
+        upload = blob_client.upload_blob(
             content_bytes,
             overwrite=True,
             content_settings=ContentSettings(content_type=final_content_type),
-            metadata=metadata
+            metadata=metadata,
+            max_concurrency=_MAX_CONCURRENCY
         )
 
         logger.info("Event uploaded to Azure Blob Storage successfully")
 
-        # Get blob properties
-        blob_properties = blob_client.get_blob_properties()
-
         return {
             "sent": True,
             "destination": "azure_blob",
             "container": container_name,
             "blob": blob_name,
-            "compressed": compress,
+            "compressed": compression != 'none',
+            "compression": compression,
             "size_bytes": len(content_bytes),
-            "etag": blob_properties.etag,
-            "last_modified": blob_properties.last_modified.isoformat() if blob_properties.last_modified else None
+            "etag": upload.get('etag'),
+            "last_modified": upload['last_modified'].isoformat() if upload.get('last_modified') else None
         }
 
     except AzureError as e:
+        # Re-check the container on the next event in case it was deleted underneath us
+        _known_containers.discard(destination)
         logger.error("Failed to upload to Azure Blob Storage: %s", e)
         raise RuntimeError(f"Failed to upload to Azure Blob Storage container '{container_name}': {e}")
     except Exception as e:
@@ -159,28 +186,59 @@ def process(event_data: dict, properties: dict) -> dict:
         raise RuntimeError(f"Unexpected error: {e}")
 
 
+@lru_cache(maxsize=32)
+def _get_client(connection_string, account_name, account_key):
+    """
+    Return a cached BlobServiceClient for the given account.
+
+    The client is thread-safe; sharing it keeps TLS connections warm across deliveries.
+    """
+    if connection_string:
+        return BlobServiceClient.from_connection_string(connection_string)
+    account_url = f"https://{account_name}.blob.core.windows.net"
+    return BlobServiceClient(
+        account_url=account_url,
+        credential=account_key
+    )
+
+
+def ensure_container(container_client, container_name: str):
+    """Ensure the container exists: create it and treat ResourceExistsError as success."""
+    try:
+        container_client.create_container()
+        logger.info("Created container: %s", container_name)
+    except ResourceExistsError:
+        logger.debug("Container '%s' already exists", container_name)
+
+
 def build_blob_name(
     prefix: str,
     partition_by_date: bool,
     partition_format: str,
-    compress: bool,
-    event_data: dict
+    compression: str,
+    event_data: dict,
+    file_format: str = 'json',
+    now: Optional[datetime] = None
 ) -> str:
-    """Build blob name with optional date partitioning."""
+    """Build blob name with optional date partitioning (``now`` defaults to the current UTC time)."""
     name_parts = [prefix.rstrip('/')]
 
-    # Add date partition
-    if partition_by_date:
-        date_part = datetime.now(timezone.utc).strftime(partition_format)
-        name_parts.append(date_part.rstrip('/'))
+    # Add date partition (same clock read as the filename timestamp)
+    if now is None:
+        now = datetime.now(timezone.utc)
+    date_part, timestamp = key_time_parts(now, partition_format if partition_by_date else None)
+    if date_part is not None:
+        name_parts.append(date_part)
 
     # Generate unique filename
-    event_id = event_data.get('eventId', str(uuid.uuid4()))
-    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
-
-    extension = 'json'
-    if compress:
-        extension += '.gz'
+    event_id = event_data.get('eventId')
+    if event_id is None:
+        # Only 8 characters end up in the name; draw just those instead of a full UUID.
+        event_id = secrets.token_hex(4)
+
+    extension = 'msgpack' if file_format == 'msgpack' else 'json'
+    if compression != 'none':
+        extension += '.' + COMPRESSION_FORMATS[compression][1]
 
     filename = f"{timestamp}-{event_id[:8]}.{extension}"
     name_parts.append(filename)
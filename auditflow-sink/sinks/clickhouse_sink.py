@@ -52,7 +52,7 @@ import logging
 
 import requests
 
-from auditflow_sdk import require_properties
+from auditflow_sdk import is_true, require_properties
 
 __version__ = "1.1.0"
 
@@ -81,11 +81,6 @@ PROPERTIES = {
 logger = logging.getLogger(__name__)
 
 
-def _is_true(properties: dict, key: str, default: str = "true") -> bool:
-    """Pipeline properties arrive as strings from YAML; parse booleans defensively."""
-    return str(properties.get(key, default)).strip().lower() == "true"
-
-
 def process(event_data: dict, properties: dict) -> dict:
     """Insert a single pre-shaped row into a ClickHouse table."""
     require_properties(properties, "service-url", "table")
@@ -105,9 +100,9 @@ def process(event_data: dict, properties: dict) -> dict:
         "input_format_skip_unknown_fields": "1",
     }
 
-    if _is_true(properties, "async-insert"):
+    if is_true(properties, "async-insert", "true"):
         params["async_insert"] = "1"
-        params["wait_for_async_insert"] = "1" if _is_true(properties, "wait-for-async-insert") else "0"
+        params["wait_for_async_insert"] = "1" if is_true(properties, "wait-for-async-insert", "true") else "0"
         params["async_insert_busy_timeout_ms"] = str(
             properties.get("async-insert-busy-timeout-ms", 200))
         # On by default (ClickHouse's own default). AuditFlow does not control how many deliveries
@@ -116,7 +111,7 @@ def process(event_data: dict, properties: dict) -> dict:
         # stretches toward the max when they are dense. Pin it only if you know deliveries are
         # concurrent — measured 5.1 -> 7.9 rows per flush there, but a 3.4x p50 penalty when they
         # are not.
-        adaptive = _is_true(properties, "async-insert-use-adaptive-busy-timeout", "true")
+        adaptive = is_true(properties, "async-insert-use-adaptive-busy-timeout", "true")
         params["async_insert_use_adaptive_busy_timeout"] = "1" if adaptive else "0"
         # Only meaningful while the adaptive window is on; sent only when the operator sets it.
         busy_timeout_min_ms = properties.get("async-insert-busy-timeout-min-ms")
@@ -126,7 +121,7 @@ def process(event_data: dict, properties: dict) -> dict:
     username = properties.get("username")
     auth = (username, properties.get("password") or "") if username else None
 
-    body = json.dumps(event_data, separators=(",", ":")).encode("utf-8")
+    body = json.dumps(event_data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
     try:
         response = requests.post(
@@ -134,7 +129,7 @@ def process(event_data: dict, properties: dict) -> dict:
             params=params,
             data=body,
             auth=auth,
-            verify=_is_true(properties, "verify-ssl"),
+            verify=is_true(properties, "verify-ssl", "true"),
             timeout=timeout,
         )
         response.raise_for_status()
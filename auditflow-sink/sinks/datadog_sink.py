@@ -30,7 +30,7 @@ def process(event_data: dict, properties: dict) -> dict:
         "ddsource": properties.get("source", "auditflow"),
         "service": properties.get("service", "auditflow"),
         "ddtags": properties.get("tags", ""),
-        "message": json.dumps(event_data),
+        "message": json.dumps(event_data, ensure_ascii=False),
     }
     headers = {"DD-API-KEY": properties["api-key"], "Content-Type": "application/json"}
     timeout = float(properties.get("timeout", 10))
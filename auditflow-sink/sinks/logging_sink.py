@@ -5,7 +5,8 @@ This sink writes audit events to the console/logs.
 Useful for debugging and development.
 """
 import logging
-import json
+
+from auditflow_sdk import dumps, is_true
 
 __version__ = "1.0.0"
 
@@ -13,18 +14,35 @@ __version__ = "1.0.0"
 PROPERTIES = {
     "log-level": "Log level: DEBUG/INFO/WARNING/ERROR (default: INFO)",
     "format": "Output format: 'json' or 'text' (default: json)",
+    "pretty": "Indent json output for reading during debugging: true/false (default: false)",
 }
 
 logger = logging.getLogger(__name__)
 
 
+class _LazyJson:
+    """Serializes the event only when a handler formats the record, and at most once."""
+
+    __slots__ = ('data', 'indent', '_text')
+
+    def __init__(self, data: dict, indent: bool = False):
+        self.data = data
+        self.indent = indent
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = dumps(self.data, indent=self.indent).decode()
+        return self._text
+
+
 def process(event_data: dict, properties: dict) -> dict:
     """
     Process an audit event by logging it.
 
     Args:
         event_data: The transformed audit event data
-        properties: Configuration properties (log-level, format, etc.)
+        properties: Configuration properties (log-level, format, pretty, etc.)
 
     Returns:
         dict: Processing result information
@@ -33,13 +51,23 @@ def process(event_data: dict, properties: dict) -> dict:
     log_level = properties.get('log-level', 'INFO').upper()
     log_format = properties.get('format', 'json')  # json or text
 
-    # Set up logger level
+    # Set up logger level — only on change: setLevel() invalidates the level cache of every logger
     numeric_level = getattr(logging, log_level, logging.INFO)
-    logger.setLevel(numeric_level)
+    if logger.level != numeric_level:
+        logger.setLevel(numeric_level)
+
+    # Skip serialization entirely when the record would be dropped (e.g. logging.disable())
+    if not logger.isEnabledFor(numeric_level):
+        return {
+            "logged": False,
+            "log_level": log_level,
+            "format": log_format,
+            "event_id": event_data.get('eventId', 'unknown')
+        }
 
-    # Format the message
+    # Format the message; json is rendered lazily so records dropped by handler filters cost nothing
     if log_format == 'json':
-        message = json.dumps(event_data, indent=2)
+        message = _LazyJson(event_data, is_true(properties, 'pretty', 'false'))
     else:
         message = event_data
 
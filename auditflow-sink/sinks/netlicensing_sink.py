@@ -43,11 +43,17 @@ Expected event structure (from checkout module):
 """
 import logging
 import base64
+import gzip
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional
-from urllib.parse import urljoin
+from urllib.parse import urlencode, urljoin
+
+from auditflow_sdk import dumps, is_true
 
 __version__ = "1.0.0"
 
@@ -61,6 +67,11 @@ PROPERTIES = {
     "save-transaction-data": "Store transaction metadata on the licensee: true/false (default: true)",
     "timeout": "HTTP request timeout in seconds (default: 30)",
     "retry-count": "Number of API retry attempts on failure (default: 3)",
+    "max-concurrency": "Maximum purchase order items processed in parallel (default: 8)",
+    "cache-ttl": "Seconds to cache license template lookups; licensee lookups are cached for at most "
+                 "30s (default: 300, 0 disables)",
+    "compress-requests": "Gzip-encode request bodies above 1 KiB; the API endpoint must accept "
+                         "Content-Encoding: gzip: true/false (default: false)",
 }
 
 logger = logging.getLogger(__name__)
@@ -69,6 +80,23 @@ logger = logging.getLogger(__name__)
 NETLICENSING_BASE_URL = "https://go.netlicensing.io/core/v2/rest/"
 USER_AGENT = "Labs64-AuditFlow-NetLicensingSink/1.0"
 
+# Retry policy: transient statuses only; backoff capped so a delivery never stalls for long
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_BACKOFF = 5.0
+MAX_RETRY_AFTER = 30.0
+
+# Request bodies above this size are gzipped (level 1) when compress-requests is enabled
+COMPRESS_MIN_BYTES = 1024
+
+# Process-wide cache of read-only lookups (license templates, licensees), shared by all client
+# instances: (base_url, api_key, entity, number) -> (expires_at, value). Bounded by clearing.
+_LOOKUP_CACHE_MAX = 1024
+_LICENSEE_CACHE_TTL = 30
+_lookup_cache: dict = {}
+
+# Shared read-only stand-in for absent (or null) nested objects in the event payload
+_EMPTY = MappingProxyType({})
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -86,6 +114,9 @@ def process(event_data: dict, properties: dict) -> dict:
             - save-transaction-data: Store transaction data in licensee (default: true)
             - timeout: Request timeout in seconds (default: 30)
             - retry-count: Number of retries (default: 3)
+            - max-concurrency: Items processed in parallel (default: 8)
+            - cache-ttl: Lookup cache TTL in seconds (default: 300, 0 disables)
+            - compress-requests: Gzip request bodies above 1 KiB (default: false)
 
     Returns:
         dict: Processing result with created/updated entity information
@@ -102,11 +133,14 @@ def process(event_data: dict, properties: dict) -> dict:
 
     default_product_number = properties.get('product-number')
     default_license_template = properties.get('license-template-number')
-    quantity_to_licensee = properties.get('quantity-to-licensee', 'false').lower() == 'true'
-    mark_for_transfer = properties.get('mark-for-transfer', 'true').lower() == 'true'
-    save_transaction_data = properties.get('save-transaction-data', 'true').lower() == 'true'
+    quantity_to_licensee = is_true(properties, 'quantity-to-licensee', 'false')
+    mark_for_transfer = is_true(properties, 'mark-for-transfer', 'true')
+    save_transaction_data = is_true(properties, 'save-transaction-data', 'true')
     timeout = int(properties.get('timeout', '30'))
     retry_count = int(properties.get('retry-count', '3'))
+    cache_ttl = int(properties.get('cache-ttl', '300'))
+    max_concurrency = int(properties.get('max-concurrency', '8'))
+    compress_requests = is_true(properties, 'compress-requests', 'false')
 
     # Validate event type
     event_type = event_data.get('eventType', '')
@@ -119,8 +153,8 @@ def process(event_data: dict, properties: dict) -> dict:
         }
 
     # Extract transaction data from event
-    extra = event_data.get('extra', {})
-    transaction = extra.get('transaction', {})
+    extra = event_data.get('extra') or _EMPTY
+    transaction = extra.get('transaction') or _EMPTY
 
     if not transaction:
         raise ValueError("Missing 'transaction' in event extra data")
@@ -135,31 +169,35 @@ def process(event_data: dict, properties: dict) -> dict:
             "destination": "netlicensing"
         }
 
-    # Create NetLicensing client
-    client = NetLicensingClient(
-        api_key=api_key,
-        base_url=base_url,
-        timeout=timeout,
-        retry_count=retry_count
-    )
+    # Reuse the NetLicensing client (and its pooled session) across events with the same configuration
+    client = _get_client(api_key, base_url, timeout, retry_count, cache_ttl, compress_requests)
 
     # Extract purchase order and customer
-    purchase_order = transaction.get('purchaseOrder', {})
-    customer = purchase_order.get('customer', {})
+    purchase_order = transaction.get('purchaseOrder') or _EMPTY
+    customer = purchase_order.get('customer') or _EMPTY
     items = purchase_order.get('items', [])
-    billing_info = transaction.get('billingInfo', {})
+    billing_info = transaction.get('billingInfo') or _EMPTY
 
     if not items:
         raise ValueError("Purchase order has no items")
 
-    # Process each item and create licenses
-    created_licensees = []
-    created_licenses = []
-    errors = []
-
-    for item in items:
+    # With quantity-to-licensee every unit gets its own licensee, so units are independent work.
+    # An item whose quantity cannot be expanded is recorded as that item's error, like any other.
+    if quantity_to_licensee:
+        work = []
+        outcomes = []
+        for item in items:
+            try:
+                work.extend(_expand_units(item))
+            except (TypeError, ValueError) as e:
+                outcomes.append((item, None, e))
+    else:
+        work = items
+        outcomes = []
+
+    def run(item):
         try:
-            result = _process_item(
+            return item, _process_item(
                 client=client,
                 item=item,
                 customer=customer,
@@ -171,16 +209,38 @@ def process(event_data: dict, properties: dict) -> dict:
                 quantity_to_licensee=quantity_to_licensee,
                 mark_for_transfer=mark_for_transfer,
                 save_transaction_data=save_transaction_data
-            )
+            ), None
+        except Exception as e:
+            return item, None, e
+
+    # Process items concurrently — each is a chain of NetLicensing round-trips
+    if max_concurrency > 1 and len(work) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(work))) as executor:
+            outcomes.extend(executor.map(run, work))
+    else:
+        outcomes.extend(run(item) for item in work)
+
+    created_licensees = []
+    created_licenses = []
+    errors = []
+    seen_errors = set()
+
+    for item, result, error in outcomes:
+        if error is None:
             created_licensees.extend(result.get('licensees', []))
             created_licenses.extend(result.get('licenses', []))
-        except Exception as e:
-            logger.error("Failed to process item %s: %s", item.get('sku', 'unknown'), e)
-            errors.append({
-                "item_sku": item.get('sku'),
-                "item_name": item.get('name'),
-                "error": str(e)
-            })
+            continue
+        # Units of one item usually fail the same way; report each distinct failure once
+        entry = (item.get('sku'), item.get('name'), str(error))
+        if entry in seen_errors:
+            continue
+        seen_errors.add(entry)
+        logger.error("Failed to process item %s: %s", item.get('sku', 'unknown'), error)
+        errors.append({
+            "item_sku": entry[0],
+            "item_name": entry[1],
+            "error": entry[2]
+        })
 
     if errors and not created_licensees:
         raise RuntimeError(f"Failed to process all items: {errors}")
@@ -197,6 +257,11 @@ def process(event_data: dict, properties: dict) -> dict:
     }
 
 
+def _expand_units(item: dict) -> list:
+    """Split an item into one quantity-1 copy per unit; raises TypeError for a non-int quantity."""
+    return [dict(item, quantity=1) for _ in range(item.get('quantity', 1))]
+
+
 def _process_item(
     client: 'NetLicensingClient',
     item: dict,
@@ -212,7 +277,7 @@ def _process_item(
 ) -> dict:
     """Process a single purchase order item and create licensee/licenses."""
 
-    item_extra = item.get('extra', {})
+    item_extra = item.get('extra') or _EMPTY
 
     # Get product and license template numbers
     product_number = item_extra.get('productNumber') or default_product_number
@@ -238,7 +303,7 @@ def _process_item(
         try:
             licensee = client.get_licensee(existing_licensee_number)
             # Verify licensee belongs to the same product
-            if licensee and licensee.get('product', {}).get('number') != product_number:
+            if licensee and (licensee.get('product') or _EMPTY).get('number') != product_number:
                 logger.warning("Licensee %s belongs to different product, creating new", existing_licensee_number)
                 licensee = None
         except Exception as e:
@@ -325,7 +390,7 @@ def _create_licensee(
             'billingCountry': billing_info.get('country', ''),
             'billingCity': billing_info.get('city', '')
         }
-        properties['checkoutData'] = json.dumps(transaction_data)
+        properties['checkoutData'] = dumps(transaction_data).decode()
 
     return client.create_licensee(product_number, properties)
 
@@ -354,7 +419,7 @@ def _create_license(
         logger.warning("Could not retrieve license template %s: %s", license_template_number, e)
 
     # Add item-specific properties from extra
-    item_extra = item.get('extra', {})
+    item_extra = item.get('extra') or _EMPTY
     for key in ['startDate', 'endDate', 'maxSessions', 'maxCheckouts']:
         if key in item_extra:
             properties[key] = str(item_extra[key])
@@ -362,32 +427,64 @@ def _create_license(
     return client.create_license(licensee_number, license_template_number, properties)
 
 
+@lru_cache(maxsize=16)
+def _encoded_basic(api_key: str) -> str:
+    """Encode API key for Basic auth (apiKey:)."""
+    credentials = f"apiKey:{api_key}"
+    return base64.b64encode(credentials.encode()).decode()
+
+
+@lru_cache(maxsize=16)
+def _get_client(api_key: str, base_url: str, timeout: int, retry_count: int, cache_ttl: int,
+                compress_requests: bool = False) -> 'NetLicensingClient':
+    """Return a cached client per configuration; its session is shared by concurrent deliveries."""
+    return NetLicensingClient(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        retry_count=retry_count,
+        cache_ttl=cache_ttl,
+        compress_requests=compress_requests
+    )
+
+
 class NetLicensingClient:
     """HTTP client for NetLicensing API."""
 
-    def __init__(self, api_key: str, base_url: str, timeout: int = 30, retry_count: int = 3):
+    def __init__(self, api_key: str, base_url: str, timeout: int = 30, retry_count: int = 3,
+                 cache_ttl: int = 0, compress_requests: bool = False):
         self.api_key = api_key
         self.base_url = base_url
         self.timeout = timeout
         self.retry_count = retry_count
+        self.cache_ttl = cache_ttl
+        self.compress_requests = compress_requests
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
             'Content-Type': 'application/x-www-form-urlencoded',
             'User-Agent': USER_AGENT,
-            'Authorization': f'Basic {self._encode_api_key()}'
+            'Authorization': f'Basic {_encoded_basic(self.api_key)}'
         })
-
-    def _encode_api_key(self) -> str:
-        """Encode API key for Basic auth (apiKey:)."""
-        credentials = f"apiKey:{self.api_key}"
-        return base64.b64encode(credentials.encode()).decode()
+        # Parallel item processing shares this session: keep enough pooled keep-alive connections
+        # that concurrent calls never open and drop sockets. Retries stay in _request.
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def _request(self, method: str, endpoint: str, data: Optional[dict] = None) -> dict:
         """Make HTTP request with retry logic."""
         url = urljoin(self.base_url, endpoint)
         last_error = None
 
+        # Encode (and compress) the form body once, not per attempt
+        headers = None
+        if data and self.compress_requests:
+            body = urlencode(data).encode()
+            if len(body) > COMPRESS_MIN_BYTES:
+                data = gzip.compress(body, compresslevel=1)
+                headers = {'Content-Encoding': 'gzip'}
+
         for attempt in range(self.retry_count):
             try:
                 logger.debug("NetLicensing API request: %s %s (attempt %d)", method, url, attempt + 1)
@@ -396,6 +493,7 @@ class NetLicensingClient:
                     method=method,
                     url=url,
                     data=data,
+                    headers=headers,
                     timeout=self.timeout
                 )
 
@@ -403,59 +501,85 @@ class NetLicensingClient:
 
                 result = response.json()
 
-                # Extract items from NetLicensing response format
-                if 'items' in result and 'item' in result['items']:
-                    items = result['items']['item']
-                    if isinstance(items, list) and len(items) > 0:
-                        return self._parse_item(items[0])
-                    elif isinstance(items, dict):
-                        return self._parse_item(items)
+                # Extract items from NetLicensing response format (a list or a single item)
+                items = (result.get('items') or {}).get('item')
+                if isinstance(items, list):
+                    items = items[0] if items else None
+                if isinstance(items, dict):
+                    return self._parse_item(items)
 
                 return result
 
             except requests.exceptions.RequestException as e:
                 last_error = e
                 logger.warning("NetLicensing API attempt %d failed: %s", attempt + 1, e)
-                if hasattr(e, 'response') and e.response is not None:
-                    logger.warning("Response body: %s", e.response.text[:500])
+                response = getattr(e, 'response', None)
+                if response is not None:
+                    logger.warning("Response body: %s", response.text[:500])
+
+                # Only transient failures are worth another attempt; a 4xx will fail the same way
+                if isinstance(e, requests.exceptions.HTTPError):
+                    if response is None or response.status_code not in RETRYABLE_STATUS_CODES:
+                        raise RuntimeError(f"NetLicensing API request failed: {e}")
+                elif not isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                    raise RuntimeError(f"NetLicensing API request failed: {e}")
+
                 if attempt < self.retry_count - 1:
-                    time.sleep(2 ** attempt)
+                    time.sleep(self._retry_delay(attempt, response))
                 continue
 
         raise RuntimeError(f"NetLicensing API request failed after {self.retry_count} attempts: {last_error}")
 
+    @staticmethod
+    def _retry_delay(attempt: int, response) -> float:
+        """Honor a numeric Retry-After from the server, else capped exponential backoff."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), MAX_RETRY_AFTER)
+            except ValueError:
+                pass  # HTTP-date form: fall back to backoff
+        return min(0.1 * 2 ** attempt, MAX_BACKOFF)
+
     def _parse_item(self, item: dict) -> dict:
         """Parse NetLicensing item response into flat dictionary."""
-        result = {}
+        result = {'type': item['type']} if 'type' in item else {}
 
-        if 'type' in item:
-            result['type'] = item['type']
-
-        if 'property' in item:
-            for prop in item['property']:
-                name = prop.get('name')
-                value = prop.get('value')
-                if name:
-                    result[name] = value
+        # Each name is looked up once: the walrus binds it in the filter for reuse as the key
+        result.update({name: prop.get('value')
+                       for prop in item.get('property', ()) if (name := prop.get('name'))})
 
         # Handle nested items (e.g., product in licensee)
-        if 'list' in item:
-            for nested_list in item['list']:
-                list_name = nested_list.get('name')
-                if list_name and 'property' in nested_list:
-                    nested_props = {}
-                    for prop in nested_list['property']:
-                        name = prop.get('name')
-                        value = prop.get('value')
-                        if name:
-                            nested_props[name] = value
-                    result[list_name] = nested_props
+        result.update({
+            list_name: {name: prop.get('value')
+                        for prop in nested_list['property'] if (name := prop.get('name'))}
+            for nested_list in item.get('list', ())
+            if (list_name := nested_list.get('name')) and 'property' in nested_list
+        })
 
         return result
 
+    def _cached(self, entity: str, number: str, ttl: int, endpoint: str) -> dict:
+        """GET ``endpoint`` through the process-wide lookup cache (``ttl <= 0`` bypasses it)."""
+        if ttl <= 0:
+            return self._request('GET', endpoint)
+
+        key = (self.base_url, self.api_key, entity, number)
+        now = time.monotonic()
+        hit = _lookup_cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+        value = self._request('GET', endpoint)
+        if len(_lookup_cache) >= _LOOKUP_CACHE_MAX:
+            _lookup_cache.clear()
+        _lookup_cache[key] = (now + ttl, value)
+        return value
+
     def get_licensee(self, licensee_number: str) -> dict:
-        """Get licensee by number."""
-        return self._request('GET', f'licensee/{licensee_number}')
+        """Get licensee by number (cached briefly: repeated items in one order reuse the lookup)."""
+        return self._cached('licensee', licensee_number, min(self.cache_ttl, _LICENSEE_CACHE_TTL),
+                            f'licensee/{licensee_number}')
 
     def create_licensee(self, product_number: str, properties: dict) -> dict:
         """Create a new licensee."""
@@ -464,8 +588,9 @@ class NetLicensingClient:
         return self._request('POST', 'licensee', data)
 
     def get_license_template(self, license_template_number: str) -> dict:
-        """Get license template by number."""
-        return self._request('GET', f'licensetemplate/{license_template_number}')
+        """Get license template by number (cached for ``cache_ttl`` seconds)."""
+        return self._cached('licensetemplate', license_template_number, self.cache_ttl,
+                            f'licensetemplate/{license_template_number}')
 
     def create_license(self, licensee_number: str, license_template_number: str, properties: dict) -> dict:
         """Create a new license."""
@@ -4,10 +4,16 @@ OpenSearch Sink - Send events to OpenSearch/Elasticsearch.
 This sink sends transformed audit events to an OpenSearch cluster.
 """
 import logging
+import time
 import requests
-from datetime import datetime, timezone
+import orjson
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
+from auditflow_sdk import DeliveryCoalescer, dumps, is_true
+
 __version__ = "1.0.0"
 
 PROPERTIES = {
@@ -16,10 +22,147 @@ PROPERTIES = {
     "username": "Basic auth username (optional)",
     "password": "Basic auth password (optional)",
     "verify-ssl": "Verify TLS certificates: true/false (default: true)",
+    "batch": "Index concurrent deliveries together through the index's _bulk API: true/false (default: false)",
+    "batch-linger-ms": "With batch, wait this long for concurrent deliveries before a flush (default: 0)",
 }
 
 logger = logging.getLogger(__name__)
 
+# One pooled session for all deliveries: keep-alive connections instead of a TCP/TLS handshake per event.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+_HEADERS = {'Content-Type': 'application/json'}
+_BULK_HEADERS = {'Content-Type': 'application/x-ndjson'}
+# _bulk action line; the target index comes from the request path
+_BULK_INDEX_ACTION = b'{"index":{}}\n'
+
+
+class _OpenSearchConfig(NamedTuple):
+    full_url: str
+    auth: Optional[HTTPBasicAuth]
+    verify_ssl: bool
+    bulk_url: str
+    credentials: Optional[tuple]
+    batch: bool
+    linger: float
+
+
+def _parse_config(properties: dict) -> _OpenSearchConfig:
+    """Return the parsed configuration, memoized on the (hashable) property items."""
+    try:
+        key = frozenset(properties.items())
+    except TypeError:
+        # Non-scalar property values cannot be a cache key; parse without caching
+        return _build_config.__wrapped__(properties.items())
+    return _build_config(key)
+
+
+@lru_cache(maxsize=64)
+def _build_config(items) -> _OpenSearchConfig:
+    properties = dict(items)
+
+    # Validate required properties
+    service_url = properties.get('service-url')
+    if not service_url:
+        raise ValueError("Missing required property: 'service-url'")
+
+    service_path = properties.get('service-path', '/auditflow/_doc')
+    username = properties.get('username')
+    password = properties.get('password')
+
+    base_url = service_url.rstrip('/')
+    # Query parameters (e.g. ?pipeline=...) apply to _bulk too, so they are carried over
+    path, _, query = service_path.partition('?')
+    index = path.strip('/').split('/', 1)[0]
+    credentials = (username, password) if username and password else None
+
+    return _OpenSearchConfig(
+        full_url=f"{base_url}{service_path}",
+        auth=HTTPBasicAuth(*credentials) if credentials else None,
+        verify_ssl=is_true(properties, 'verify-ssl', 'true'),
+        bulk_url=f"{base_url}/{index}/_bulk" + (f"?{query}" if query else ""),
+        credentials=credentials,
+        batch=is_true(properties, 'batch', 'false'),
+        linger=int(properties.get('batch-linger-ms', '0')) / 1000,
+    )
+
+
+@lru_cache(maxsize=4)
+def _iso_second(epoch_second: int) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(epoch_second))
+
+
+def _now_iso() -> str:
+    """Current UTC time as ISO 8601 with milliseconds ('...T10:15:30.123Z'); formatted once per second."""
+    now_ms = time.time_ns() // 1_000_000
+    return f"{_iso_second(now_ms // 1000)}.{now_ms % 1000:03d}Z"
+
+
+def _index_batch(key, documents: list) -> list:
+    """Index one coalesced batch with a single _bulk request; one item result per document."""
+    bulk_url, credentials, verify_ssl = key
+    body = b''.join(_BULK_INDEX_ACTION + document + b'\n' for document in documents)
+    response = _session.post(
+        bulk_url,
+        data=body,
+        headers=_BULK_HEADERS,
+        auth=HTTPBasicAuth(*credentials) if credentials else None,
+        verify=verify_ssl,
+        timeout=10
+    )
+    response.raise_for_status()
+    try:
+        items = orjson.loads(response.content).get('items', [])
+    except orjson.JSONDecodeError as e:
+        raise RuntimeError(f"OpenSearch at {bulk_url} returned a non-JSON _bulk response "
+                           f"(HTTP {response.status_code}): {e}")
+    return [dict(item.get('index', item), batch_size=len(documents)) for item in items]
+
+
+# Concurrent deliveries to the same index share one _bulk request (see DeliveryCoalescer)
+_coalescer = DeliveryCoalescer(_index_batch, max_items=1_000, max_bytes=5 * 1024 * 1024)
+
+
+def _deliver_bulk(config: _OpenSearchConfig, event_data: dict) -> dict:
+    try:
+        document = dumps(event_data)
+        logger.info("Sending event to OpenSearch: %s", config.bulk_url)
+        item = _coalescer.submit(
+            (config.bulk_url, config.credentials, config.verify_ssl),
+            document,
+            size=len(document),
+            linger=config.linger
+        )
+    except requests.exceptions.RequestException as e:
+        logger.error("Failed to send event to OpenSearch: %s", e)
+        raise RuntimeError(f"Failed to send event to OpenSearch at {config.bulk_url}: {e}")
+    except RuntimeError:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error sending event to OpenSearch: %s", e)
+        raise RuntimeError(f"Unexpected error: {e}")
+
+    # _bulk succeeds as a whole even when single documents are rejected
+    if 'error' in item:
+        logger.error("OpenSearch rejected event: %s", item['error'])
+        raise RuntimeError(f"OpenSearch at {config.bulk_url} rejected the event: {item['error']}")
+
+    logger.info("Event sent to OpenSearch successfully. Document ID: %s", item.get('_id', 'unknown'))
+
+    return {
+        "sent": True,
+        "destination": "opensearch",
+        "url": config.bulk_url,
+        "document_id": item.get('_id'),
+        "index": item.get('_index'),
+        "result": item.get('result'),
+        "status_code": item.get('status'),
+        "batch_size": item['batch_size']
+    }
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -33,48 +176,32 @@ def process(event_data: dict, properties: dict) -> dict:
             - username: Basic auth username (optional)
             - password: Basic auth password (optional)
             - verify-ssl: Verify SSL certificates (default: true)
+            - batch: Share _bulk requests between concurrent deliveries (default: false)
+            - batch-linger-ms: Wait before a batched flush (default: 0)
 
     Returns:
         dict: Processing result with OpenSearch response
     """
-    # Validate required properties
-    service_url = properties.get('service-url')
-    if not service_url:
-        raise ValueError("Missing required property: 'service-url'")
-
-    # Get configuration
-    service_path = properties.get('service-path', '/auditflow/_doc')
-    username = properties.get('username')
-    password = properties.get('password')
-    verify_ssl = properties.get('verify-ssl', 'true').lower() == 'true'
-
-    # Build full URL
-    full_url = f"{service_url.rstrip('/')}{service_path}"
-
-    # Prepare headers
-    headers = {
-        'Content-Type': 'application/json'
-    }
+    config = _parse_config(properties)
+    full_url = config.full_url
 
     # Add timestamp if not present; copy first to avoid mutating the caller's dict
     if 'timestamp' not in event_data:
         event_data = dict(event_data)
-        event_data['timestamp'] = datetime.now(timezone.utc).isoformat()
+        event_data['timestamp'] = _now_iso()
 
-    # Prepare authentication
-    auth = None
-    if username and password:
-        auth = HTTPBasicAuth(username, password)
+    if config.batch:
+        return _deliver_bulk(config, event_data)
 
     try:
         # Send event to OpenSearch
         logger.info("Sending event to OpenSearch: %s", full_url)
-        response = requests.post(
+        response = _session.post(
             full_url,
             json=event_data,
-            headers=headers,
-            auth=auth,
-            verify=verify_ssl,
+            headers=_HEADERS,
+            auth=config.auth,
+            verify=config.verify_ssl,
             timeout=10
         )
 
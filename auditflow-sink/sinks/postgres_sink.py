@@ -53,7 +53,7 @@ def process(event_data: dict, properties: dict) -> dict:
             # We insert the raw event_data as a JSONB column named 'event_data'.
             # Alternatively, you could map fields to specific columns.
             insert_query = f"INSERT INTO {table} (event_data) VALUES (%s)"
-            cursor.execute(insert_query, (json.dumps(event_data),))
+            cursor.execute(insert_query, (json.dumps(event_data, ensure_ascii=False),))
         
         conn.commit()
         
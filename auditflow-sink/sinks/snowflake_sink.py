@@ -61,7 +61,7 @@ def process(event_data: dict, properties: dict) -> dict:
         # Identifiers are operator-configured (trusted); the event payload is parameterized.
         cursor.execute(
             f"INSERT INTO {table} ({column}) SELECT PARSE_JSON(%s)",
-            (json.dumps(event_data),),
+            (json.dumps(event_data, ensure_ascii=False),),
         )
         cursor.close()
     finally:
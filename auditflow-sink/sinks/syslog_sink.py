@@ -5,9 +5,13 @@ This sink sends audit events to a Syslog server using standard syslog protocol.
 Supports both UDP and TCP transports.
 """
 import logging
+import select
 import socket
-import json
-from datetime import datetime, timezone
+import threading
+import time
+from functools import lru_cache
+
+from auditflow_sdk import dumps
 
 __version__ = "1.0.0"
 
@@ -95,23 +99,19 @@ def process(event_data: dict, properties: dict) -> dict:
     if protocol not in ['udp', 'tcp']:
         raise ValueError(f"Invalid protocol: {protocol}. Must be 'udp' or 'tcp'")
 
-    # Calculate priority
-    facility_code = FACILITY.get(facility, FACILITY['USER'])
-    severity_code = SEVERITY.get(severity, SEVERITY['INFO'])
-    priority = (facility_code * 8) + severity_code
-
     # Format message
     if msg_format == 'json':
         message = format_json(event_data)
     elif msg_format == 'cef':
         message = format_cef(event_data)
     else:
-        message = json.dumps(event_data)
+        message = format_json(event_data)
 
-    # Build syslog message (RFC 3164 format)
-    timestamp = datetime.now(timezone.utc).strftime('%b %d %H:%M:%S')
-    hostname = socket.gethostname()
-    syslog_message = f"<{priority}>{timestamp} {hostname} {tag}: {message}"
+    # Build syslog message (RFC 3164 format): "<PRI>Mmm dd hh:mm:ss HOST TAG: MSG"
+    syslog_message = b''.join((
+        _priority(facility, severity), _timestamp(int(time.time())), _HOSTNAME,
+        _tag(tag), message.encode('utf-8')
+    ))
 
     try:
         # Send via UDP or TCP
@@ -138,30 +138,140 @@ def process(event_data: dict, properties: dict) -> dict:
         raise RuntimeError(f"Failed to send event to Syslog at {host}:{port}: {e}")
 
 
-def send_udp(host: str, port: int, message: str):
-    """Send message via UDP."""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(5)
+# CEF header up to the Signature ID: version 0, device vendor/product/version
+_CEF_PREFIX = "CEF:0|Labs64|AuditFlow|1.0|"
+
+# The host name does not change while the process runs
+_HOSTNAME = b' ' + socket.gethostname().encode('utf-8') + b' '
+
+
+@lru_cache(maxsize=64)
+def _priority(facility: str, severity: str) -> bytes:
+    """Encoded '<PRI>' prefix for a facility/severity pair; unknown names fall back to USER/INFO."""
+    facility_code = FACILITY.get(facility, FACILITY['USER'])
+    severity_code = SEVERITY.get(severity, SEVERITY['INFO'])
+    return f"<{facility_code * 8 + severity_code}>".encode('ascii')
+
+
+@lru_cache(maxsize=4)
+def _timestamp(epoch_second: int) -> bytes:
+    """RFC 3164 timestamp (UTC), formatted once per second."""
+    return time.strftime('%b %d %H:%M:%S', time.gmtime(epoch_second)).encode('ascii')
+
+
+@lru_cache(maxsize=64)
+def _tag(tag: str) -> bytes:
+    return tag.encode('utf-8') + b': '
+
+
+# Resolved syslog addresses, (host, port) -> (expires_at, sockaddr); re-resolved after the TTL
+# so a moved syslog server is picked up without a restart.
+_ADDRESS_TTL = 60.0
+_addresses: dict = {}
+
+# One shared UDP socket for all deliveries (sendto is atomic per datagram, so threads can share it)
+_udp_sock = None
+_udp_lock = threading.Lock()
+
+
+def _resolve(host: str, port: int) -> tuple:
+    """Return the IPv4 socket address for host:port, cached for _ADDRESS_TTL seconds."""
+    now = time.monotonic()
+    entry = _addresses.get((host, port))
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    sockaddr = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_DGRAM)[0][4]
+    _addresses[(host, port)] = (now + _ADDRESS_TTL, sockaddr)
+    return sockaddr
+
+
+def _get_udp_socket() -> socket.socket:
+    global _udp_sock
+    sock = _udp_sock
+    if sock is None:
+        with _udp_lock:
+            if _udp_sock is None:
+                _udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock = _udp_sock
+    return sock
+
+
+def send_udp(host: str, port: int, message: bytes):
+    """Send an encoded message via UDP over the shared socket."""
+    global _udp_sock
+    sock = _get_udp_socket()
     try:
-        sock.sendto(message.encode('utf-8'), (host, port))
-    finally:
+        sock.sendto(message, _resolve(host, port))
+    except OSError:
+        # Drop a broken socket so the next delivery starts from a fresh one
+        with _udp_lock:
+            if _udp_sock is sock:
+                _udp_sock = None
         sock.close()
+        raise
+
 
+# Persistent TCP connections, (host, port) -> [socket or None, lock]. The per-connection lock keeps
+# concurrent messages from interleaving on the stream.
+_tcp_conns: dict = {}
+_tcp_conns_lock = threading.Lock()
 
-def send_tcp(host: str, port: int, message: str):
-    """Send message via TCP."""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(5)
+
+def _tcp_slot(host: str, port: int) -> list:
+    slot = _tcp_conns.get((host, port))
+    if slot is None:
+        with _tcp_conns_lock:
+            slot = _tcp_conns.setdefault((host, port), [None, threading.Lock()])
+    return slot
+
+
+def _connect_tcp(host: str, port: int) -> socket.socket:
+    sock = socket.create_connection((host, port), timeout=5)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    return sock
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    """True when the server has closed an idle connection (readable with EOF or an error pending)."""
+    # poll, not select: select() rejects descriptors >= FD_SETSIZE (1024)
+    poller = select.poll()
+    poller.register(sock, select.POLLIN)
+    if not poller.poll(0):
+        return False
     try:
-        sock.connect((host, port))
-        sock.sendall(message.encode('utf-8') + b'\n')
-    finally:
-        sock.close()
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except OSError:
+        return True
+
+
+def send_tcp(host: str, port: int, message: bytes):
+    """Send an encoded message via TCP over a persistent connection, reconnecting once if it was dropped."""
+    data = message + b'\n'
+    slot = _tcp_slot(host, port)
+    with slot[1]:
+        sock = slot[0]
+        if sock is not None and _peer_closed(sock):
+            sock.close()
+            sock = slot[0] = None
+        if sock is not None:
+            try:
+                sock.sendall(data)
+                return
+            except OSError:
+                sock.close()
+                slot[0] = None
+        sock = _connect_tcp(host, port)
+        try:
+            sock.sendall(data)
+        except OSError:
+            sock.close()
+            raise
+        slot[0] = sock
 
 
 def format_json(event_data: dict) -> str:
-    """Format event as JSON string."""
-    return json.dumps(event_data, separators=(',', ':'))
+    """Format event as compact JSON string."""
+    return dumps(event_data).decode()
 
 
 def format_cef(event_data: dict) -> str:
@@ -169,26 +279,13 @@ def format_cef(event_data: dict) -> str:
     Format event as Common Event Format (CEF).
     CEF:Version|Device Vendor|Device Product|Device Version|Signature ID|Name|Severity|Extension
     """
-    extra = event_data.get('extra', {})
-
-    # CEF header
-    cef_version = 0
-    device_vendor = "Labs64"
-    device_product = "AuditFlow"
-    device_version = "1.0"
-    signature_id = event_data.get('eventType', 'unknown')
-    name = extra.get('action_name', 'unknown')
-    severity = 5  # Medium
-
-    # CEF extension
-    extensions = []
-    extensions.append(f"src={event_data.get('sourceSystem', 'unknown')}")
-    extensions.append(f"act={extra.get('action_name', 'unknown')}")
-    extensions.append(f"outcome={extra.get('action_status', 'unknown')}")
+    extra = event_data.get('extra') or {}
+    action_name = extra.get('action_name', 'unknown')
 
+    # Severity is fixed at 5 (Medium)
+    message = (f"{_CEF_PREFIX}{event_data.get('eventType', 'unknown')}|{action_name}|5|"
+               f"src={event_data.get('sourceSystem', 'unknown')} act={action_name} "
+               f"outcome={extra.get('action_status', 'unknown')}")
     if 'eventId' in event_data:
-        extensions.append(f"externalId={event_data['eventId']}")
-
-    extension = ' '.join(extensions)
-
-    return f"CEF:{cef_version}|{device_vendor}|{device_product}|{device_version}|{signature_id}|{name}|{severity}|{extension}"
+        message += f" externalId={event_data['eventId']}"
+    return message
@@ -4,18 +4,25 @@ Webhook Sink - Send events to HTTP webhooks (Zapier, Make, n8n, etc.).
 This sink sends audit events to webhook URLs, supporting various webhook platforms.
 """
 import logging
-import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
 import hmac
-import hashlib
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+
+from auditflow_sdk import dumps, is_true
 
 __version__ = "1.0.0"
 
 PROPERTIES = {
     "webhook-url": "Webhook URL to deliver the event to (required)",
     "method": "HTTP method: GET or POST (default: POST)",
-    "content-type": "Content-Type header (default: application/json)",
+    "content-type": "Content-Type header (default: application/json, or application/msgpack for msgpack)",
+    "serialization": "POST body encoding: json or msgpack (default: json)",
     "headers": "Additional headers as a JSON object string (optional)",
     "secret": "HMAC-SHA256 signing secret (optional)",
     "signature-header": "Header name for the HMAC signature (default: X-Hub-Signature-256)",
@@ -26,6 +33,56 @@ PROPERTIES = {
 
 logger = logging.getLogger(__name__)
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+SERIALIZATIONS = ('json', 'msgpack')
+
+# Transient statuses worth another attempt; anything else fails the delivery immediately
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Longest Retry-After wait honoured, in seconds (urllib3 would otherwise sleep up to 6 hours)
+MAX_RETRY_AFTER = 30.0
+
+
+# Pooled sessions, retry-count -> session. Kept for the life of the process: an evicted session
+# would leave its pooled connections open until garbage collection.
+_sessions: dict = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(retry_count: int) -> requests.Session:
+    """
+    Pooled session per retry-count: keep-alive connections instead of a TCP/TLS handshake per
+    event, with retries and exponential backoff (honoring Retry-After, capped at
+    MAX_RETRY_AFTER) handled by urllib3.
+    """
+    session = _sessions.get(retry_count)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(retry_count)
+            if session is None:
+                session = _sessions[retry_count] = _new_session(retry_count)
+    return session
+
+
+def _new_session(retry_count: int) -> requests.Session:
+    retry = Retry(
+        total=max(retry_count - 1, 0),
+        backoff_factor=1,
+        status_forcelist=RETRYABLE_STATUS_CODES,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        retry_after_max=MAX_RETRY_AFTER,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
 def process(event_data: dict, properties: dict) -> dict:
     """
@@ -37,6 +94,7 @@ def process(event_data: dict, properties: dict) -> dict:
             - webhook-url: Webhook URL (required)
             - method: HTTP method - GET or POST (default: POST)
             - content-type: Content-Type header (default: application/json)
+            - serialization: POST body encoding - 'json' or 'msgpack' (default: json)
             - headers: Additional headers as JSON string (optional)
             - secret: Secret for HMAC signature (optional)
             - signature-header: Header name for signature (default: X-Hub-Signature-256)
@@ -47,19 +105,121 @@ def process(event_data: dict, properties: dict) -> dict:
     Returns:
         dict: Processing result with webhook response
     """
+    config = _parse_config(properties)
+    webhook_url = config.webhook_url
+    method = config.method
+    timeout = config.timeout
+    verify_ssl = config.verify_ssl
+    retry_count = config.retry_count
+
+    # Encode once, outside the retry loop: POST sends the serialized body, GET the flattened
+    # event as a query string. The signature covers exactly the bytes sent.
+    query = None
+    if method == 'POST':
+        payload = prepare_payload(event_data, config.content_type, config.serialization)
+    elif method == 'GET':
+        query = urlencode(flatten_dict(event_data))
+        payload = query.encode('ascii')
+    else:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
+    # Add signature if secret is provided (the parsed headers are shared, so extend a copy)
+    headers = config.headers
+    if config.secret:
+        headers = dict(headers)
+        headers[config.signature_header] = generate_signature(payload, config.secret)
+
+    # Send webhook; retries and backoff happen inside the session's transport adapter
+    session = _get_session(retry_count)
+    try:
+        logger.info("Sending webhook to %s (up to %d attempts)", webhook_url, retry_count)
+
+        if query is None:
+            response = session.post(
+                webhook_url,
+                data=payload,
+                headers=headers,
+                timeout=timeout,
+                verify=verify_ssl
+            )
+        else:
+            response = session.get(
+                webhook_url,
+                params=query,
+                headers=headers,
+                timeout=timeout,
+                verify=verify_ssl
+            )
+
+        response.raise_for_status()
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Failed to send webhook after up to %d attempts: %s", retry_count, e)
+        raise RuntimeError(f"Failed to send webhook to {webhook_url}: {e}")
+
+    logger.info("Webhook sent successfully. Status: %s", response.status_code)
+
+    retries = getattr(response.raw, 'retries', None)
+    return {
+        "sent": True,
+        "destination": "webhook",
+        "url": webhook_url,
+        "method": method,
+        "status_code": response.status_code,
+        "response_time_ms": int(response.elapsed.total_seconds() * 1000),
+        "attempt": len(retries.history) + 1 if retries is not None else 1,
+        "response_body": response.text[:200] if response.text else None
+    }
+
+
+def prepare_payload(event_data: dict, content_type: str, serialization: str = 'json') -> bytes:
+    """Prepare the request body based on serialization and content type."""
+    if serialization == 'msgpack':
+        if msgspec is None:
+            raise RuntimeError("msgspec library is required for serialization 'msgpack'. Install with: pip install msgspec")
+        return msgspec.msgpack.encode(event_data)
+    if content_type == 'application/x-www-form-urlencoded':
+        return urlencode(flatten_dict(event_data)).encode('utf-8')
+    return dumps(event_data)
+
+
+class _WebhookConfig(NamedTuple):
+    webhook_url: str
+    method: str
+    content_type: str
+    serialization: str
+    timeout: int
+    verify_ssl: bool
+    retry_count: int
+    headers: dict
+    secret: Optional[bytes]
+    signature_header: str
+
+
+def _parse_config(properties: dict) -> _WebhookConfig:
+    """Return the parsed configuration, memoized on the (hashable) property items."""
+    try:
+        key = frozenset(properties.items())
+    except TypeError:
+        # Non-scalar property values cannot be a cache key; parse without caching
+        return _build_config.__wrapped__(properties.items())
+    return _build_config(key)
+
+
+@lru_cache(maxsize=64)
+def _build_config(items) -> _WebhookConfig:
+    properties = dict(items)
+
     # Validate required properties
     webhook_url = properties.get('webhook-url')
     if not webhook_url:
         raise ValueError("Missing required property: 'webhook-url'")
 
-    # Get configuration
-    method = properties.get('method', 'POST').upper()
-    content_type = properties.get('content-type', 'application/json')
-    timeout = int(properties.get('timeout', '30'))
-    verify_ssl = properties.get('verify-ssl', 'true').lower() == 'true'
-    retry_count = int(properties.get('retry-count', '3'))
-    secret = properties.get('secret')
-    signature_header = properties.get('signature-header', 'X-Hub-Signature-256')
+    serialization = properties.get('serialization', 'json').lower()
+    if serialization not in SERIALIZATIONS:
+        raise ValueError(f"Invalid serialization '{serialization}'. Must be 'json' or 'msgpack'")
+    content_type = properties.get(
+        'content-type', 'application/msgpack' if serialization == 'msgpack' else 'application/json')
 
     # Parse additional headers
     headers = {
@@ -74,101 +234,47 @@ def process(event_data: dict, properties: dict) -> dict:
         except json.JSONDecodeError:
             logger.warning("Failed to parse additional headers: %s", additional_headers)
 
-    # Prepare payload
-    payload = prepare_payload(event_data, content_type)
+    # The signing secret is encoded once here, not per event
+    secret = properties.get('secret')
 
-    # Add signature if secret is provided
-    if secret:
-        signature = generate_signature(payload, secret)
-        headers[signature_header] = signature
+    return _WebhookConfig(
+        webhook_url=webhook_url,
+        method=properties.get('method', 'POST').upper(),
+        content_type=content_type,
+        serialization=serialization,
+        timeout=int(properties.get('timeout', '30')),
+        verify_ssl=is_true(properties, 'verify-ssl', 'true'),
+        retry_count=int(properties.get('retry-count', '3')),
+        headers=headers,
+        secret=secret.encode('utf-8') if secret else None,
+        signature_header=properties.get('signature-header', 'X-Hub-Signature-256'),
+    )
 
-    # Send webhook with retries
-    last_error = None
-    for attempt in range(retry_count):
-        try:
-            logger.info("Sending webhook to %s (attempt %d/%d)", webhook_url, attempt + 1, retry_count)
-
-            if method == 'POST':
-                response = requests.post(
-                    webhook_url,
-                    data=payload if content_type != 'application/json' else None,
-                    json=event_data if content_type == 'application/json' else None,
-                    headers=headers,
-                    timeout=timeout,
-                    verify=verify_ssl
-                )
-            elif method == 'GET':
-                response = requests.get(
-                    webhook_url,
-                    params=flatten_dict(event_data),
-                    headers=headers,
-                    timeout=timeout,
-                    verify=verify_ssl
-                )
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-
-            logger.info("Webhook sent successfully. Status: %s", response.status_code)
-
-            return {
-                "sent": True,
-                "destination": "webhook",
-                "url": webhook_url,
-                "method": method,
-                "status_code": response.status_code,
-                "response_time_ms": int(response.elapsed.total_seconds() * 1000),
-                "attempt": attempt + 1,
-                "response_body": response.text[:200] if response.text else None
-            }
-
-        except requests.exceptions.RequestException as e:
-            last_error = e
-            logger.warning("Webhook attempt %d failed: %s", attempt + 1, e)
-            if attempt < retry_count - 1:
-                # Exponential backoff
-                time.sleep(2 ** attempt)
-            continue
-
-    # All retries failed
-    logger.error("Failed to send webhook after %d attempts: %s", retry_count, last_error)
-    raise RuntimeError(f"Failed to send webhook to {webhook_url}: {last_error}")
-
-
-def prepare_payload(event_data: dict, content_type: str) -> str:
-    """Prepare payload based on content type."""
-    if content_type == 'application/json':
-        return json.dumps(event_data)
-    elif content_type == 'application/x-www-form-urlencoded':
-        from urllib.parse import urlencode
-        return urlencode(flatten_dict(event_data))
-    else:
-        return json.dumps(event_data)
 
-
-def generate_signature(payload: str, secret: str) -> str:
+def generate_signature(payload: bytes, secret: bytes) -> str:
     """
     Generate HMAC signature for webhook verification (GitHub/Zapier style).
-    Uses SHA-256 hash.
+    Uses SHA-256 hash over the exact request body bytes; hmac.digest is the one-shot C path.
     """
-    signature = hmac.new(
-        secret.encode('utf-8'),
-        payload.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-    return f"sha256={signature}"
+    return f"sha256={hmac.digest(secret, payload, 'sha256').hex()}"
 
 
 def flatten_dict(d: dict, parent_key: str = '', sep: str = '.') -> dict:
-    """Flatten nested dictionary for URL encoding."""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            items.append((new_key, json.dumps(v)))
+    """Flatten nested dictionary for URL encoding (iterative, keys in document order)."""
+    flat = {}
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for k, v in items:
+            key = f"{prefix}{sep}{k}" if prefix else k
+            if isinstance(v, dict):
+                # Descend; this level resumes from its iterator once the child is exhausted
+                stack.append((key, iter(v.items())))
+                break
+            elif isinstance(v, list):
+                flat[key] = dumps(v).decode()
+            else:
+                flat[key] = str(v)
         else:
-            items.append((new_key, str(v)))
-    return dict(items)
+            stack.pop()
+    return flat
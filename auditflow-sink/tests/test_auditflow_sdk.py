@@ -0,0 +1,49 @@
+import gzip
+from datetime import datetime
+
+import pytest
+
+from auditflow_sdk import compress_payload, dumps, is_true, key_time_parts
+
+
+@pytest.mark.parametrize("value", ["true", "True", " TRUE ", "1", "yes", "on", True])
+def test_is_true_accepts_common_spellings(value):
+    assert is_true({"flag": value}, "flag") is True
+
+
+@pytest.mark.parametrize("value", ["false", "0", "no", "", False])
+def test_is_true_rejects_everything_else(value):
+    assert is_true({"flag": value}, "flag") is False
+
+
+def test_is_true_uses_default_when_missing():
+    assert is_true({}, "flag", "true") is True
+    assert is_true({}, "flag") is False
+
+
+def test_chunked_compression_matches_joined_payload():
+    chunks = [b'{"a":1}\n', b'{"b":2}\n', b'{"c":3}\n']
+    assert gzip.decompress(compress_payload(chunks, "gzip", 5)) == b"".join(chunks)
+    assert compress_payload(chunks, "none") == b"".join(chunks)
+
+
+def test_chunked_zstd_compression():
+    zstandard = pytest.importorskip("zstandard")
+    chunks = [b"x" * 100, b"y" * 100]
+    compressed = compress_payload(chunks, "zstd")
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(compressed) == b"".join(chunks)
+
+
+def test_key_time_parts_formats_each_offset_separately():
+    utc = datetime.fromisoformat("2026-08-07T10:15:30+00:00")
+    cest = datetime.fromisoformat("2026-08-07T12:15:30+02:00")
+    assert utc == cest  # same instant — must still not share a cache entry
+
+    assert key_time_parts(utc, "hour=%H/") == ("hour=10", "20260807-101530")
+    assert key_time_parts(cest, "hour=%H/") == ("hour=12", "20260807-121530")
+
+
+def test_dumps_falls_back_for_values_orjson_rejects():
+    assert dumps({"amount": 123456789012345678901234567890, 1: "ü"}) == \
+        '{"amount":123456789012345678901234567890,"1":"ü"}'.encode("utf-8")
+    assert dumps({"a": [1]}, indent=True) == b'{\n  "a": [\n    1\n  ]\n}'
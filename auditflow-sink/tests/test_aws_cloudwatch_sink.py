@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from botocore.exceptions import ClientError
+from unittest.mock import MagicMock, patch
+
+from sinks import aws_cloudwatch_sink
+
+PROPERTIES = {"log-group": "/auditflow/audit", "log-stream": "events"}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    aws_cloudwatch_sink._get_client.cache_clear()
+    aws_cloudwatch_sink._known_streams.clear()
+    yield
+    aws_cloudwatch_sink._get_client.cache_clear()
+    aws_cloudwatch_sink._known_streams.clear()
+
+
+@pytest.fixture
+def logs_client():
+    client = MagicMock()
+    with patch("boto3.session.Session.client", return_value=client):
+        yield client
+
+
+def test_missing_log_group():
+    with pytest.raises(ValueError, match="Missing required property: 'log-group'"):
+        aws_cloudwatch_sink.process({}, {})
+
+
+def test_sends_event_as_json_message(logs_client):
+    result = aws_cloudwatch_sink.process({"eventId": "e1"}, PROPERTIES)
+
+    log_events = logs_client.put_log_events.call_args.kwargs["logEvents"]
+    assert json.loads(log_events[0]["message"]) == {"eventId": "e1"}
+    assert "sequenceToken" not in logs_client.put_log_events.call_args.kwargs
+    assert result["sent"] is True
+
+
+def test_existence_checks_run_once_per_destination(logs_client):
+    for _ in range(3):
+        aws_cloudwatch_sink.process({"eventId": "e1"}, PROPERTIES)
+
+    assert logs_client.create_log_group.call_count == 1
+    assert logs_client.create_log_stream.call_count == 1
+    assert logs_client.put_log_events.call_count == 3
+    logs_client.describe_log_groups.assert_not_called()
+    logs_client.describe_log_streams.assert_not_called()
+
+
+def test_existing_log_group_and_stream_are_accepted(logs_client):
+    exists = ClientError({"Error": {"Code": "ResourceAlreadyExistsException", "Message": "exists"}}, "Create")
+    logs_client.create_log_group.side_effect = exists
+    logs_client.create_log_stream.side_effect = exists
+
+    assert aws_cloudwatch_sink.process({"eventId": "e1"}, PROPERTIES)["sent"] is True
+
+
+def test_concurrent_deliveries_share_one_put(logs_client):
+    aws_cloudwatch_sink.process({"eventId": "warm"}, PROPERTIES)
+    logs_client.put_log_events.reset_mock()
+
+    release = threading.Event()
+    logs_client.put_log_events.side_effect = lambda **kwargs: release.wait(2) and {}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(aws_cloudwatch_sink.process, {"eventId": f"e{i}"}, dict(PROPERTIES, batch="true"))
+                   for i in range(5)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert all(r["sent"] for r in results)
+    # The first put carries one event; the four that queued behind it go out together.
+    assert logs_client.put_log_events.call_count == 2
+    batch = logs_client.put_log_events.call_args.kwargs["logEvents"]
+    assert len(batch) == 4
+
+
+def test_deleted_stream_is_recreated_once(logs_client):
+    aws_cloudwatch_sink.process({"eventId": "warm"}, PROPERTIES)
+    missing = ClientError({"Error": {"Code": "ResourceNotFoundException", "Message": "gone"}}, "PutLogEvents")
+    logs_client.put_log_events.side_effect = [missing, {}]
+
+    assert aws_cloudwatch_sink.process({"eventId": "e1"}, PROPERTIES)["sent"] is True
+    assert logs_client.create_log_stream.call_count == 2
+    assert logs_client.put_log_events.call_count == 3
+
+
+def test_oversized_event_is_rejected_before_the_put(logs_client):
+    event = {"eventId": "big", "payload": "x" * aws_cloudwatch_sink.MAX_EVENT_BYTES}
+
+    with pytest.raises(ValueError, match="CloudWatch Logs accepts at most 262144 bytes per event"):
+        aws_cloudwatch_sink.process(event, dict(PROPERTIES, batch="true"))
+    logs_client.put_log_events.assert_not_called()
+
+
+def test_deliveries_are_not_shared_without_batch(logs_client):
+    aws_cloudwatch_sink.process({"eventId": "warm"}, PROPERTIES)
+    release = threading.Event()
+    logs_client.put_log_events.side_effect = lambda **kwargs: release.wait(2) and {}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(aws_cloudwatch_sink.process, {"eventId": f"e{i}"}, PROPERTIES) for i in range(3)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert [r["batch_size"] for r in results] == [1, 1, 1]
+    assert logs_client.put_log_events.call_count == 4
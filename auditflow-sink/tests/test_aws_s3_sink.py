@@ -0,0 +1,233 @@
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sinks import aws_s3_sink
+
+EVENT = {
+    "eventId": "fedcba98-7654-3210-fedc-ba9876543210",
+    "eventType": "audit.test",
+    "tenantId": "t_mock",
+    "timestamp": "2026-08-07T10:15:30Z",
+    "extra": {"city": "München"},
+}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_client_cache():
+    aws_s3_sink._get_client.cache_clear()
+    yield
+    aws_s3_sink._get_client.cache_clear()
+
+
+def _client():
+    client = MagicMock()
+    client.put_object.return_value = {"ETag": '"abc123"', "VersionId": "v1"}
+    return client
+
+
+def test_missing_bucket():
+    with pytest.raises(ValueError, match="Missing required property: 'bucket'"):
+        aws_s3_sink.process(EVENT, {})
+
+
+@patch("boto3.session.Session.client")
+def test_uploads_pretty_json_by_default(mock_client):
+    client = _client()
+    mock_client.return_value = client
+
+    result = aws_s3_sink.process(EVENT, {"bucket": "audit"})
+
+    kwargs = client.put_object.call_args.kwargs
+    assert kwargs["ContentType"] == "application/json"
+    assert json.loads(kwargs["Body"]) == EVENT
+    assert kwargs["Body"].startswith(b"{\n  ")
+    assert kwargs["Key"] == "auditflow/tenant=t_mock/year=2026/month=08/day=07/20260807-101530-fedcba98.json"
+    assert result["etag"] == "abc123"
+    assert result["size_bytes"] == len(kwargs["Body"])
+
+
+def test_object_key_without_date_partition():
+    key = aws_s3_sink.build_object_key("auditflow/", False, "year=%Y/", "jsonl", "none", EVENT)
+    assert key == "auditflow/tenant=t_mock/20260807-101530-fedcba98.json"
+
+
+def test_object_key_without_event_id_gets_random_suffix():
+    event = {k: v for k, v in EVENT.items() if k != "eventId"}
+    key = aws_s3_sink.build_object_key("auditflow/", False, "", "json", "none", event)
+    suffix = key.rsplit("-", 1)[1].split(".")[0]
+    assert len(suffix) == 8 and int(suffix, 16) >= 0
+
+
+@patch("boto3.session.Session.client")
+def test_jsonl_is_single_line_utf8(mock_client):
+    client = _client()
+    mock_client.return_value = client
+
+    aws_s3_sink.process(EVENT, {"bucket": "audit", "file-format": "jsonl"})
+
+    body = client.put_object.call_args.kwargs["Body"]
+    assert body.endswith(b"\n") and body.count(b"\n") == 1
+    assert "München".encode("utf-8") in body
+
+
+@patch("boto3.session.Session.client")
+def test_compress_gzips_the_payload(mock_client):
+    client = _client()
+    mock_client.return_value = client
+
+    result = aws_s3_sink.process(EVENT, {"bucket": "audit", "compress": "true"})
+
+    kwargs = client.put_object.call_args.kwargs
+    assert kwargs["ContentType"] == "application/gzip"
+    assert kwargs["Key"].endswith(".json.gz")
+    assert json.loads(gzip.decompress(kwargs["Body"])) == EVENT
+    assert result["compressed"] is True
+
+
+@patch("boto3.session.Session.client")
+def test_zstd_compression(mock_client):
+    zstandard = pytest.importorskip("zstandard")
+    client = _client()
+    mock_client.return_value = client
+
+    result = aws_s3_sink.process(EVENT, {"bucket": "audit", "compression": "zstd"})
+
+    kwargs = client.put_object.call_args.kwargs
+    assert kwargs["ContentType"] == "application/zstd"
+    assert kwargs["Key"].endswith(".json.zst")
+    assert json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(kwargs["Body"])) == EVENT
+    assert result["compression"] == "zstd"
+
+
+def test_invalid_compression():
+    with pytest.raises(ValueError, match="Invalid compression 'lz4'"):
+        aws_s3_sink.process(EVENT, {"bucket": "audit", "compression": "lz4"})
+
+
+@patch("boto3.session.Session.client")
+def test_msgpack_file_format(mock_client):
+    msgspec = pytest.importorskip("msgspec")
+    client = _client()
+    mock_client.return_value = client
+
+    aws_s3_sink.process(EVENT, {"bucket": "audit", "file-format": "msgpack", "compress": "true"})
+
+    kwargs = client.put_object.call_args.kwargs
+    assert kwargs["Key"].endswith(".msgpack.gz")
+    assert msgspec.msgpack.decode(gzip.decompress(kwargs["Body"])) == EVENT
+
+
+@patch("boto3.session.Session.client")
+def test_large_objects_use_multipart_transfer(mock_client, monkeypatch):
+    client = _client()
+    client.head_object.return_value = {"ETag": '"abc-2"', "VersionId": "v2"}
+    mock_client.return_value = client
+    monkeypatch.setattr(aws_s3_sink, "_MULTIPART_THRESHOLD", 16)
+
+    result = aws_s3_sink.process(EVENT, {"bucket": "audit"})
+
+    client.put_object.assert_not_called()
+    fileobj, bucket, key = client.upload_fileobj.call_args.args
+    assert json.loads(fileobj.getvalue()) == EVENT
+    assert (bucket, key) == ("audit", result["key"])
+    assert client.upload_fileobj.call_args.kwargs["ExtraArgs"]["ContentType"] == "application/json"
+    client.head_object.assert_called_once_with(Bucket="audit", Key=result["key"])
+    assert (result["etag"], result["version_id"]) == ("abc-2", "v2")
+
+
+@patch("boto3.session.Session.client")
+def test_client_is_reused_across_events(mock_client):
+    mock_client.return_value = _client()
+
+    aws_s3_sink.process(EVENT, {"bucket": "audit"})
+    aws_s3_sink.process(EVENT, {"bucket": "audit", "prefix": "other/"})
+    aws_s3_sink.process(EVENT, {"bucket": "audit", "region": "eu-central-1"})
+
+    # Same region/endpoint/credentials share one client; a different region gets its own.
+    assert mock_client.call_count == 2
+
+
+def test_batch_requires_line_oriented_format():
+    with pytest.raises(ValueError, match="'batch' requires file-format"):
+        aws_s3_sink.process(EVENT, {"bucket": "audit", "batch": "true"})
+
+
+@patch("boto3.session.Session.client")
+def test_concurrent_batched_deliveries_share_one_object(mock_client):
+    client = _client()
+    mock_client.return_value = client
+    release = threading.Event()
+    puts = []
+
+    def put_object(**kwargs):
+        puts.append(kwargs)
+        if len(puts) == 1:
+            release.wait(2)
+        return {"ETag": '"e"'}
+
+    client.put_object.side_effect = put_object
+    properties = {"bucket": "audit", "file-format": "jsonl", "batch": "true", "compress": "true"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(aws_s3_sink.process, dict(EVENT, eventId=f"id{i}-0000"), properties)
+                   for i in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert len(puts) == 2
+    lines = gzip.decompress(puts[1]["Body"]).splitlines()
+    assert len(lines) == 3
+    assert puts[1]["Metadata"] == {"event-count": "3"}
+    assert sorted(r["batch_size"] for r in results) == [1, 3, 3, 3]
+
+
+def test_properties_are_parsed_once_per_configuration():
+    aws_s3_sink._build_config.cache_clear()
+    properties = {"bucket": "audit", "compression": "gzip"}
+
+    first = aws_s3_sink._parse_config(properties)
+    assert aws_s3_sink._parse_config(dict(properties)) is first
+    assert aws_s3_sink._build_config.cache_info().misses == 1
+    assert first.compression == "gzip" and first.partition_by_date is True
+
+
+def test_event_timestamps_are_parsed_once_per_string():
+    aws_s3_sink._event_time.cache_clear()
+    for _ in range(3):
+        key = aws_s3_sink.build_object_key("auditflow/", True, "year=%Y/", "json", "none", EVENT)
+        assert "/year=2026/" in key
+    assert aws_s3_sink._event_time.cache_info().misses == 1
+
+
+def test_malformed_timestamp_falls_back_to_now():
+    event = dict(EVENT, timestamp="not-a-timestamp")
+    key = aws_s3_sink.build_object_key("auditflow/", False, "", "json", "none", event)
+    assert key.startswith("auditflow/tenant=t_mock/") and key.endswith("-fedcba98.json")
+
+
+@patch("boto3.client", side_effect=AssertionError("default session used"))
+@patch("boto3.session.Session.client")
+def test_clients_are_built_from_a_private_session(session_client, default_client):
+    session_client.return_value = _client()
+
+    aws_s3_sink.process(EVENT, {"bucket": "audit"})
+
+    session_client.assert_called_once()
+    default_client.assert_not_called()
+
+
+@patch("boto3.session.Session.client")
+def test_integers_beyond_64_bits_are_archived_exactly(mock_client):
+    client = _client()
+    mock_client.return_value = client
+
+    aws_s3_sink.process(dict(EVENT, amount=123456789012345678901234567890), {"bucket": "audit", "file-format": "jsonl"})
+
+    assert b'"amount":123456789012345678901234567890' in client.put_object.call_args.kwargs["Body"]
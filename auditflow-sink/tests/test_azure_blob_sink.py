@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from azure.core.exceptions import ResourceExistsError
+from unittest.mock import MagicMock, patch
+
+from sinks import azure_blob_sink
+
+EVENT = {"eventId": "0123456789abcdef", "eventType": "audit.test", "sourceSystem": "tests"}
+PROPERTIES = {"container": "audit", "connection-string": "UseDevelopmentStorage=true"}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    azure_blob_sink._get_client.cache_clear()
+    azure_blob_sink._known_containers.clear()
+    yield
+    azure_blob_sink._get_client.cache_clear()
+    azure_blob_sink._known_containers.clear()
+
+
+@pytest.fixture
+def blob_service():
+    service = MagicMock()
+    container = service.get_container_client.return_value
+    container.get_blob_client.return_value.upload_blob.return_value = {
+        "etag": '"0x1"', "last_modified": datetime(2026, 8, 7, tzinfo=timezone.utc)}
+    with patch.object(azure_blob_sink.BlobServiceClient, "from_connection_string",
+                      return_value=service) as factory:
+        service.factory = factory
+        yield service
+
+
+def test_missing_container():
+    with pytest.raises(ValueError, match="Missing required property: 'container'"):
+        azure_blob_sink.process(EVENT, {})
+
+
+def test_uploads_json_and_reports_upload_response(blob_service):
+    result = azure_blob_sink.process(EVENT, PROPERTIES)
+
+    blob_client = blob_service.get_container_client.return_value.get_blob_client.return_value
+    assert json.loads(blob_client.upload_blob.call_args.args[0]) == EVENT
+    blob_client.get_blob_properties.assert_not_called()
+    assert result["etag"] == '"0x1"'
+    assert result["blob"].endswith("-01234567.json")
+
+
+def test_client_and_container_check_are_reused(blob_service):
+    container = blob_service.get_container_client.return_value
+    container.create_container.side_effect = ResourceExistsError("exists")
+
+    for _ in range(3):
+        azure_blob_sink.process(EVENT, PROPERTIES)
+
+    assert blob_service.factory.call_count == 1
+    assert container.create_container.call_count == 1
+    container.exists.assert_not_called()
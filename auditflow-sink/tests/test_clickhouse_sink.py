@@ -71,6 +71,17 @@ def test_body_is_a_single_jsoneachrow_line(mock_post):
     assert json.loads(body) == ROW
 
 
+@patch("requests.post")
+def test_non_ascii_is_sent_as_raw_utf8(mock_post):
+    mock_post.return_value = _ok_response()
+
+    clickhouse_sink.process(dict(ROW, extra={"city": "München"}), BASE_PROPERTIES)
+
+    body = mock_post.call_args.kwargs["data"]
+    assert "München".encode("utf-8") in body
+    assert b"\\u00fc" not in body
+
+
 @patch("requests.post")
 def test_async_insert_disabled_omits_the_settings(mock_post):
     mock_post.return_value = _ok_response()
@@ -0,0 +1,83 @@
+"""Tests for the group-commit helper shared by batching sinks."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from auditflow_sdk import DeliveryCoalescer
+
+
+def test_single_submit_flushes_immediately():
+    calls = []
+    coalescer = DeliveryCoalescer(lambda key, items: calls.append((key, items)) or items)
+
+    assert coalescer.submit("k", 1) == 1
+    assert calls == [("k", [1])]
+
+
+def test_concurrent_submits_share_a_flush():
+    release = threading.Event()
+    batches = []
+
+    def flush(key, items):
+        batches.append(list(items))
+        if len(batches) == 1:
+            release.wait(2)  # hold the first flush so the others queue up behind it
+        return [item * 10 for item in items]
+
+    coalescer = DeliveryCoalescer(flush)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        first = pool.submit(coalescer.submit, "k", 0)
+        time.sleep(0.05)
+        rest = [pool.submit(coalescer.submit, "k", i) for i in range(1, 6)]
+        time.sleep(0.05)
+        release.set()
+
+        assert first.result(2) == 0
+        assert sorted(f.result(2) for f in rest) == [10, 20, 30, 40, 50]
+
+    # Every caller got its own result, but only two calls reached the destination.
+    assert batches[0] == [0]
+    assert sorted(batches[1]) == [1, 2, 3, 4, 5]
+
+
+def test_flush_failure_reaches_every_caller_in_the_batch():
+    def flush(key, items):
+        raise RuntimeError("destination down")
+
+    coalescer = DeliveryCoalescer(flush)
+    with pytest.raises(RuntimeError, match="destination down"):
+        coalescer.submit("k", 1)
+    # The coalescer recovers for the next delivery.
+    with pytest.raises(RuntimeError, match="destination down"):
+        coalescer.submit("k", 2)
+
+
+def test_limits_split_batches():
+    release = threading.Event()
+    batches = []
+
+    def flush(key, items):
+        batches.append(list(items))
+        if len(batches) == 1:
+            release.wait(2)
+        return items
+
+    coalescer = DeliveryCoalescer(flush, max_items=2, max_bytes=100)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(coalescer.submit, "k", 0, 10)]
+        time.sleep(0.05)
+        futures += [pool.submit(coalescer.submit, "k", i, 60) for i in range(1, 4)]
+        time.sleep(0.05)
+        release.set()
+        for future in futures:
+            future.result(2)
+
+    assert all(len(batch) == 1 for batch in batches[1:])  # 60 + 60 bytes exceeds max_bytes
+
+
+def test_keys_are_independent():
+    coalescer = DeliveryCoalescer(lambda key, items: [key] * len(items))
+    assert coalescer.submit("a", 1) == "a"
+    assert coalescer.submit("b", 1) == "b"
@@ -0,0 +1,121 @@
+import gzip
+import json
+from datetime import datetime, timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sinks import gcs_sink
+
+EVENT = {"eventId": "0123456789abcdef", "eventType": "audit.test", "sourceSystem": "tests"}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_client_cache():
+    gcs_sink._get_client.cache_clear()
+    gcs_sink._get_bucket.cache_clear()
+    yield
+    gcs_sink._get_client.cache_clear()
+    gcs_sink._get_bucket.cache_clear()
+
+
+@pytest.fixture
+def bucket():
+    client = MagicMock()
+    with patch.object(gcs_sink.storage, "Client", return_value=client):
+        yield client.bucket.return_value
+
+
+def _uploaded(bucket):
+    blob = bucket.blob.return_value
+    return bucket.blob.call_args.args[0], blob.upload_from_string.call_args
+
+
+def test_missing_bucket():
+    with pytest.raises(ValueError, match="Missing required property: 'bucket'"):
+        gcs_sink.process(EVENT, {})
+
+
+def test_uploads_json(bucket):
+    gcs_sink.process(EVENT, {"bucket": "audit"})
+
+    name, call = _uploaded(bucket)
+    assert name.endswith("-01234567.json")
+    assert json.loads(call.args[0]) == EVENT
+    assert call.kwargs["content_type"] == "application/json"
+
+
+def test_gzip_uses_configured_level(bucket):
+    with patch.object(gzip, "compress", wraps=gzip.compress) as compress:
+        gcs_sink.process(EVENT, {"bucket": "audit", "compress": "true", "compress-level": "1"})
+
+    assert compress.call_args.kwargs["compresslevel"] == 1
+    name, call = _uploaded(bucket)
+    assert name.endswith(".json.gz")
+    assert json.loads(gzip.decompress(call.args[0])) == EVENT
+
+
+def test_zstd_compression(bucket):
+    zstandard = pytest.importorskip("zstandard")
+
+    gcs_sink.process(EVENT, {"bucket": "audit", "compression": "zstd"})
+
+    name, call = _uploaded(bucket)
+    assert name.endswith(".json.zst")
+    assert call.kwargs["content_type"] == "application/zstd"
+    assert json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(call.args[0])) == EVENT
+
+
+def test_client_and_bucket_are_reused(bucket):
+    for _ in range(3):
+        gcs_sink.process(EVENT, {"bucket": "audit"})
+    gcs_sink.process(EVENT, {"bucket": "other"})
+
+    assert gcs_sink.storage.Client.call_count == 1
+    assert gcs_sink._get_bucket.cache_info().currsize == 2
+
+
+def test_batch_requires_jsonl():
+    with pytest.raises(ValueError, match="'batch' requires file-format 'jsonl'"):
+        gcs_sink.process(EVENT, {"bucket": "audit", "batch": "true"})
+
+
+def test_concurrent_batched_deliveries_share_one_object(bucket):
+    release = threading.Event()
+    uploads = []
+
+    def upload_from_string(content, content_type):
+        uploads.append(content)
+        if len(uploads) == 1:
+            release.wait(2)
+
+    bucket.blob.return_value.upload_from_string.side_effect = upload_from_string
+    properties = {"bucket": "audit", "file-format": "jsonl", "batch": "true", "compress": "true"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(gcs_sink.process, dict(EVENT, eventId=f"id{i}-0000"), properties)
+                   for i in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert len(uploads) == 2
+    assert len(gzip.decompress(uploads[1]).splitlines()) == 3
+    assert sorted(r["batch_size"] for r in results) == [1, 3, 3, 3]
+
+
+def test_object_name_layout():
+    now = datetime(2026, 8, 7, 10, 15, 30, tzinfo=timezone.utc)
+    assert gcs_sink.build_object_name("audit/", True, "year=%Y/", "gzip", EVENT, now) == \
+        "audit/year=2026/20260807-101530-01234567.json.gz"
+    assert gcs_sink.build_object_name("audit", False, "", "none", {}, now).startswith("audit/20260807-101530-")
+
+
+def test_json_objects_are_compact(bucket):
+    gcs_sink.process(EVENT, {"bucket": "audit"})
+
+    _, call = _uploaded(bucket)
+    assert b"\n" not in call.args[0]
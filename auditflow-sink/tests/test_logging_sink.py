@@ -0,0 +1,66 @@
+import logging
+
+from unittest.mock import patch
+
+from sinks import logging_sink
+
+
+def test_logs_event_at_requested_level(caplog):
+    with caplog.at_level(logging.DEBUG, logger=logging_sink.logger.name):
+        result = logging_sink.process({"eventId": "e1"}, {"log-level": "warning"})
+
+    assert result["logged"] is True
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert '"eventId"' in caplog.records[-1].getMessage()
+
+
+def test_level_is_only_set_when_it_changes():
+    logging_sink.process({"eventId": "e1"}, {"log-level": "INFO"})
+    with patch.object(logging_sink.logger, "setLevel") as set_level:
+        logging_sink.process({"eventId": "e2"}, {"log-level": "INFO"})
+    set_level.assert_not_called()
+
+
+def test_disabled_level_skips_serialization():
+    logging.disable(logging.CRITICAL)
+    try:
+        with patch.object(logging_sink, "dumps") as dumps:
+            result = logging_sink.process({"eventId": "e1"}, {"log-level": "INFO"})
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert result["logged"] is False
+    dumps.assert_not_called()
+
+
+def test_json_is_compact_unless_pretty(caplog):
+    with caplog.at_level(logging.INFO, logger=logging_sink.logger.name):
+        logging_sink.process({"eventId": "e1"}, {})
+        logging_sink.process({"eventId": "e1"}, {"pretty": "true"})
+
+    compact, pretty = (r.getMessage() for r in caplog.records[-2:])
+    assert compact.endswith('{"eventId":"e1"}')
+    assert pretty.endswith('{\n  "eventId": "e1"\n}')
+
+
+def test_json_is_serialized_only_when_a_handler_emits():
+    handler = logging.Handler()
+    handler.addFilter(lambda record: False)
+    logging_sink.logger.addHandler(handler)
+    logging_sink.logger.propagate = False
+    try:
+        with patch.object(logging_sink, "dumps") as dumps:
+            result = logging_sink.process({"eventId": "e1"}, {"log-level": "INFO"})
+    finally:
+        logging_sink.logger.removeHandler(handler)
+        logging_sink.logger.propagate = True
+
+    assert result["logged"] is True
+    dumps.assert_not_called()
+
+
+def test_integers_beyond_64_bits_are_logged_exactly(caplog):
+    with caplog.at_level(logging.INFO, logger=logging_sink.logger.name):
+        logging_sink.process({"amount": 123456789012345678901234567890}, {})
+
+    assert caplog.records[-1].getMessage().endswith('{"amount":123456789012345678901234567890}')
@@ -0,0 +1,116 @@
+import gzip
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sinks import loki_sink
+
+PROPERTIES = {"service-url": "http://loki:3100/"}
+
+
+def _stream(labels, line):
+    return {"streams": [{"stream": labels, "values": [["1700000000000000000", line]]}]}
+
+
+@pytest.fixture
+def post():
+    response = MagicMock(status_code=204)
+    with patch.object(loki_sink._session, "post", return_value=response) as mock_post:
+        yield mock_post
+
+
+def test_missing_service_url():
+    with pytest.raises(ValueError, match="Missing required property: 'service-url'"):
+        loki_sink.process({}, {})
+
+
+def test_wraps_plain_event(post):
+    result = loki_sink.process({"eventId": "e1", "eventType": "audit.test"}, PROPERTIES)
+
+    assert post.call_args.args[0] == "http://loki:3100/loki/api/v1/push"
+    stream = json.loads(post.call_args.kwargs["data"])["streams"][0]
+    assert stream["stream"]["event_type"] == "audit.test"
+    assert json.loads(stream["values"][0][1]) == {"eventId": "e1", "eventType": "audit.test"}
+    assert result["status_code"] == 204
+
+
+def test_compress_gzips_the_body(post):
+    loki_sink.process(_stream({"job": "a"}, "x"), dict(PROPERTIES, compress="true", **{"tenant-id": "t1"}))
+
+    headers = post.call_args.kwargs["headers"]
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["X-Scope-OrgID"] == "t1"
+    assert json.loads(gzip.decompress(post.call_args.kwargs["data"]))["streams"][0]["values"][0][1] == "x"
+
+
+def test_concurrent_deliveries_share_one_push_merged_by_labels(post):
+    release = threading.Event()
+    bodies = []
+
+    def slow_post(url, data, **kwargs):
+        bodies.append(json.loads(data))
+        if len(bodies) == 1:
+            release.wait(2)
+        return MagicMock(status_code=204)
+
+    post.side_effect = slow_post
+    events = [_stream({"job": "a" if i % 2 else "b"}, f"line{i}") for i in range(5)]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(loki_sink.process, event, dict(PROPERTIES, batch="true")) for event in events]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert len(bodies) == 2
+    merged = {s["stream"]["job"]: len(s["values"]) for s in bodies[1]["streams"]}
+    assert sum(merged.values()) == 4 and len(merged) <= 2
+    assert sorted(r["batch_size"] for r in results) == [1, 4, 4, 4, 4]
+
+
+def test_deliveries_are_not_merged_without_batch(post):
+    loki_sink.process(_stream({"job": "a"}, "x"), PROPERTIES)
+    loki_sink.process(_stream({"job": "a"}, "y"), PROPERTIES)
+
+    assert post.call_count == 2
+
+
+def test_rejected_shared_push_fails_only_the_bad_delivery(post):
+    release = threading.Event()
+    bodies = []
+
+    def strict_post(url, data, **kwargs):
+        body = json.loads(data)
+        bodies.append(body)
+        if len(bodies) == 1:
+            release.wait(2)
+        lines = [v[1] for s in body["streams"] for v in s["values"]]
+        response = MagicMock(status_code=400 if "bad" in lines else 204)
+        if "bad" in lines:
+            response.raise_for_status.side_effect = loki_sink.requests.exceptions.HTTPError("400 entry too old")
+        return response
+
+    post.side_effect = strict_post
+    lines = ["first", "ok1", "bad", "ok2"]
+    properties = dict(PROPERTIES, batch="true")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {line: pool.submit(loki_sink.process, _stream({"job": "a"}, line), properties) for line in lines}
+        time.sleep(0.1)
+        release.set()
+        outcomes = {line: f.exception(2) for line, f in futures.items()}
+
+    # first alone, then the merged push of the other three (rejected), then each of them alone
+    assert len(bodies) == 5
+    assert isinstance(outcomes["bad"], RuntimeError)
+    assert [line for line, error in outcomes.items() if error is None] == ["first", "ok1", "ok2"]
+
+
+def test_unhashable_labels_fail_only_their_delivery(post):
+    with pytest.raises(RuntimeError):
+        loki_sink.process(_stream({"job": ["a"]}, "x"), dict(PROPERTIES, batch="true"))
+    post.assert_not_called()
@@ -0,0 +1,204 @@
+import gzip
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from sinks import netlicensing_sink
+from sinks.netlicensing_sink import NetLicensingClient
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    netlicensing_sink._lookup_cache.clear()
+    netlicensing_sink._get_client.cache_clear()
+    yield
+    netlicensing_sink._lookup_cache.clear()
+    netlicensing_sink._get_client.cache_clear()
+
+
+def _client(cache_ttl=300):
+    return NetLicensingClient(api_key="k", base_url="https://nlic.test/", cache_ttl=cache_ttl)
+
+
+def test_missing_api_key():
+    with pytest.raises(ValueError, match="Missing required property: 'api-key'"):
+        netlicensing_sink.process({}, {})
+
+
+def test_license_template_lookup_is_shared_across_clients():
+    with patch.object(NetLicensingClient, "_request", return_value={"licenseType": "TIMEVOLUME"}) as request:
+        assert _client().get_license_template("LT1")["licenseType"] == "TIMEVOLUME"
+        _client().get_license_template("LT1")
+        _client().get_license_template("LT2")
+
+    assert request.call_count == 2
+
+
+def test_cache_ttl_zero_disables_caching():
+    with patch.object(NetLicensingClient, "_request", return_value={}) as request:
+        _client(cache_ttl=0).get_license_template("LT1")
+        _client(cache_ttl=0).get_license_template("LT1")
+
+    assert request.call_count == 2
+
+
+def test_licensee_lookup_ttl_is_capped(monkeypatch):
+    clock = iter([0.0, 31.0])
+    monkeypatch.setattr(netlicensing_sink.time, "monotonic", lambda: next(clock))
+    with patch.object(NetLicensingClient, "_request", return_value={"number": "L1"}) as request:
+        _client().get_licensee("L1")
+        _client().get_licensee("L1")
+
+    assert request.call_count == 2
+
+
+def _checkout(*items):
+    return {
+        "eventType": "checkout.transaction.completed",
+        "extra": {"transaction": {
+            "id": "tx1",
+            "status": "COMPLETED",
+            "purchaseOrder": {"customer": {"email": "a@b.c"}, "items": list(items)},
+        }},
+    }
+
+
+def _fake_api():
+    counter = iter(range(1000))
+
+    def request(self, method, endpoint, data=None):
+        if method == "GET":
+            return {"licenseType": "FEATURE"}
+        return {"number": f"{endpoint}-{next(counter)}"}
+    return request
+
+
+def test_items_and_units_are_processed_in_parallel():
+    item = {"sku": "s1", "quantity": 3, "extra": {"productNumber": "P1", "licenseTemplateNumber": "LT1"}}
+    broken = {"sku": "s2", "quantity": 1, "extra": {}}
+
+    with patch.object(NetLicensingClient, "_request", _fake_api()):
+        result = netlicensing_sink.process(
+            _checkout(item, broken), {"api-key": "k", "quantity-to-licensee": "true"})
+
+    assert result["licensees_created"] == 3
+    assert result["licenses_created"] == 3
+    assert [e["item_sku"] for e in result["errors"]] == ["s2"]
+
+
+def test_bad_quantity_is_an_item_error_not_an_order_failure():
+    item = {"sku": "s1", "quantity": 1, "extra": {"productNumber": "P1", "licenseTemplateNumber": "LT1"}}
+    bad = dict(item, sku="s2", quantity="2")
+
+    with patch.object(NetLicensingClient, "_request", _fake_api()):
+        result = netlicensing_sink.process(
+            _checkout(item, bad), {"api-key": "k", "quantity-to-licensee": "true"})
+
+    assert result["licensees_created"] == 1
+    assert [e["item_sku"] for e in result["errors"]] == ["s2"]
+
+
+def test_failing_units_report_their_error_once():
+    item = {"sku": "s1", "quantity": 1, "extra": {"productNumber": "P1", "licenseTemplateNumber": "LT1"}}
+    broken = {"sku": "s2", "quantity": 3, "extra": {}}
+
+    with patch.object(NetLicensingClient, "_request", _fake_api()):
+        result = netlicensing_sink.process(
+            _checkout(item, broken), {"api-key": "k", "quantity-to-licensee": "true"})
+
+    assert len(result["errors"]) == 1
+
+
+def test_quantity_shares_one_licensee_by_default():
+    item = {"sku": "s1", "quantity": 2, "extra": {"productNumber": "P1", "licenseTemplateNumber": "LT1"}}
+
+    with patch.object(NetLicensingClient, "_request", _fake_api()):
+        result = netlicensing_sink.process(_checkout(item, dict(item, sku="s3")), {"api-key": "k"})
+
+    assert result["licensees_created"] == 2
+    assert result["licenses_created"] == 4
+    assert result["errors"] is None
+
+
+def test_null_nested_objects_are_treated_as_absent():
+    item = {"sku": "s1", "quantity": 1, "extra": None}
+    event = _checkout(item)
+    event["extra"]["transaction"]["purchaseOrder"]["customer"] = None
+
+    with patch.object(NetLicensingClient, "_request", _fake_api()):
+        result = netlicensing_sink.process(
+            event, {"api-key": "k", "product-number": "P1", "license-template-number": "LT1"})
+
+    assert result["licenses_created"] == 1
+    assert result["errors"] is None
+
+
+def _response(status, headers=None):
+    response = MagicMock(status_code=status, headers=headers or {}, text="")
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    return response
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    sleep = MagicMock()
+    monkeypatch.setattr(netlicensing_sink.time, "sleep", sleep)
+    client = _client()
+
+    with patch.object(client.session, "request", return_value=_response(400)) as request:
+        with pytest.raises(RuntimeError, match="request failed"):
+            client.create_licensee("P1", {})
+
+    assert request.call_count == 1
+    sleep.assert_not_called()
+
+
+def test_retry_after_is_honored_for_throttling(monkeypatch):
+    sleep = MagicMock()
+    monkeypatch.setattr(netlicensing_sink.time, "sleep", sleep)
+    client = _client()
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = {"number": "L1"}
+
+    with patch.object(client.session, "request", side_effect=[_response(429, {"Retry-After": "2"}), _response(503), ok]):
+        assert client.create_licensee("P1", {}) == {"number": "L1"}
+
+    assert [c.args[0] for c in sleep.call_args_list] == [2.0, 0.2]
+
+
+def test_response_items_are_flattened():
+    response = {"items": {"item": [{
+        "type": "Licensee",
+        "property": [{"name": "number", "value": "L1"}, {"value": "ignored"}],
+        "list": [{"name": "product", "property": [{"name": "number", "value": "P1"}]}, {"name": "empty"}],
+    }]}}
+    client = _client()
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = response
+
+    with patch.object(client.session, "request", return_value=ok):
+        assert client.create_licensee("P1", {}) == {"type": "Licensee", "number": "L1", "product": {"number": "P1"}}
+
+
+def test_large_bodies_are_gzipped_when_enabled():
+    client = NetLicensingClient(api_key="k", base_url="https://nlic.test/", compress_requests=True)
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = {}
+
+    with patch.object(client.session, "request", return_value=ok) as request:
+        client.create_licensee("P1", {"name": "small"})
+        client.create_licensee("P1", {"checkoutData": "München " * 200})
+
+    small, large = request.call_args_list
+    assert small.kwargs["headers"] is None
+    assert small.kwargs["data"]["name"] == "small"
+    assert large.kwargs["headers"] == {"Content-Encoding": "gzip"}
+    form = parse_qs(gzip.decompress(large.kwargs["data"]).decode())
+    assert form["checkoutData"] == ["München " * 200]
+
+
+def test_client_is_reused_per_configuration():
+    first = netlicensing_sink._get_client("k", "https://nlic.test/", 30, 3, 300)
+    assert netlicensing_sink._get_client("k", "https://nlic.test/", 30, 3, 300) is first
+    assert first.session.headers["Authorization"] == "Basic YXBpS2V5Oms="
@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sinks import opensearch_sink
+
+
+def _ok_response():
+    response = MagicMock(status_code=201)
+    response.json.return_value = {"_id": "d1", "_index": "auditflow", "result": "created"}
+    return response
+
+
+def test_missing_service_url():
+    with pytest.raises(ValueError, match="Missing required property: 'service-url'"):
+        opensearch_sink.process({}, {})
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_indexes_document_with_cached_config(mock_post):
+    mock_post.return_value = _ok_response()
+    opensearch_sink._build_config.cache_clear()
+    properties = {"service-url": "https://search:9200/", "username": "u", "password": "p", "verify-ssl": "false"}
+
+    result = opensearch_sink.process({"eventId": "e1"}, properties)
+    opensearch_sink.process({"eventId": "e2"}, dict(properties))
+
+    assert result["document_id"] == "d1" and result["url"] == "https://search:9200/auditflow/_doc"
+    assert opensearch_sink._build_config.cache_info().misses == 1
+    first, second = mock_post.call_args_list
+    assert first.kwargs["auth"] is second.kwargs["auth"]
+    assert (first.kwargs["auth"].username, first.kwargs["verify"]) == ("u", False)
+    assert "timestamp" in first.kwargs["json"]
+
+
+def _bulk_response(items):
+    response = MagicMock(status_code=200)
+    response.content = orjson.dumps({"errors": False, "items": items})
+    return response
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_concurrent_batched_deliveries_share_one_bulk_request(mock_post):
+    release = threading.Event()
+    bodies = []
+
+    def post(url, data, **kwargs):
+        bodies.append((url, data, kwargs))
+        if len(bodies) == 1:
+            release.wait(2)
+        count = data.count(b"\n") // 2
+        return _bulk_response([{"index": {"_id": f"d{i}", "_index": "audit", "result": "created", "status": 201}}
+                               for i in range(count)])
+
+    mock_post.side_effect = post
+    properties = {"service-url": "http://search:9200", "service-path": "/audit/_doc", "batch": "true"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(opensearch_sink.process, {"eventId": f"e{i}", "timestamp": "t"}, properties)
+                   for i in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(2) for f in futures]
+
+    assert len(bodies) == 2
+    url, body, kwargs = bodies[1]
+    assert url == "http://search:9200/audit/_bulk"
+    assert kwargs["headers"]["Content-Type"] == "application/x-ndjson"
+    lines = body.splitlines()
+    assert lines[0::2] == [b'{"index":{}}'] * 3
+    first_event = orjson.loads(bodies[0][1].splitlines()[1])["eventId"]
+    assert sorted(orjson.loads(line)["eventId"] for line in lines[1::2]) == sorted(
+        {"e0", "e1", "e2", "e3"} - {first_event})
+    assert sorted(r["batch_size"] for r in results) == [1, 3, 3, 3]
+    assert all(r["status_code"] == 201 for r in results)
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_rejected_bulk_item_fails_its_delivery(mock_post):
+    mock_post.return_value = _bulk_response(
+        [{"index": {"_index": "audit", "status": 400, "error": {"type": "mapper_parsing_exception"}}}])
+
+    with pytest.raises(RuntimeError, match="rejected the event"):
+        opensearch_sink.process({"eventId": "e1"}, {"service-url": "http://search:9200", "batch": "true"})
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_non_json_bulk_response_is_a_runtime_error(mock_post):
+    response = MagicMock(status_code=200)
+    response.content = b"<html>proxy error</html>"
+    mock_post.return_value = response
+
+    with pytest.raises(RuntimeError, match="non-JSON _bulk response"):
+        opensearch_sink.process({"eventId": "e1"}, {"service-url": "http://search:9200", "batch": "true"})
+
+
+def test_bulk_url_keeps_the_service_path_query():
+    config = opensearch_sink._parse_config(
+        {"service-url": "http://search:9200", "service-path": "/audit/_doc?pipeline=geoip", "batch": "true"})
+    assert config.bulk_url == "http://search:9200/audit/_bulk?pipeline=geoip"
+    assert config.full_url == "http://search:9200/audit/_doc?pipeline=geoip"
+
+
+def test_generated_timestamp_is_utc_iso_with_milliseconds():
+    with patch("time.time_ns", return_value=1_754_561_730_123_456_789):
+        assert opensearch_sink._now_iso() == "2025-08-07T10:15:30.123Z"
+    parsed = datetime.fromisoformat(opensearch_sink._now_iso().replace("Z", "+00:00"))
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_batched_integers_beyond_64_bits_are_indexed_exactly(mock_post):
+    mock_post.return_value = _bulk_response([{"index": {"_id": "d1", "_index": "audit", "status": 201}}])
+
+    result = opensearch_sink.process({"eventId": "e1", "amount": 123456789012345678901234567890},
+                                     {"service-url": "http://search:9200", "batch": "true"})
+
+    assert result["document_id"] == "d1"
+    assert b'"amount":123456789012345678901234567890' in mock_post.call_args.kwargs["data"]
+
+
+@patch.object(opensearch_sink._session, "post")
+def test_unexpected_bulk_errors_are_wrapped(mock_post):
+    mock_post.return_value = MagicMock(status_code=200, content=b'{"items": "not-a-list-of-items"}')
+
+    with pytest.raises(RuntimeError, match="Unexpected error"):
+        opensearch_sink.process({"eventId": "e1"}, {"service-url": "http://search:9200", "batch": "true"})
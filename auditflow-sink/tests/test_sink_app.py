@@ -67,3 +67,44 @@ def test_datadog_sink_missing_api_key_errors():
         json={"event_data": {"eventId": "abc"}, "properties": {}},
     )
     assert response.status_code == 500
+
+
+def test_async_sink_is_awaited(monkeypatch):
+    async def process(event_data, properties):
+        return {"echo": event_data["eventId"]}
+
+    monkeypatch.setattr(sink.registry, "resolve", lambda sink_id: process)
+    response = client.post(
+        "/sink/async_sink",
+        json={"event_data": {"eventId": "abc"}, "properties": {}},
+    )
+    assert response.status_code == 200
+    assert response.json()["result"] == {"echo": "abc"}
+
+
+def test_invalid_json_body_returns_422():
+    response = client.post(
+        "/sink/logging_sink",
+        content=b"{not json",
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 422
+
+
+def test_integers_beyond_64_bits_stay_exact(monkeypatch):
+    async def process(event_data, properties):
+        return {"echo": event_data["amount"]}
+
+    monkeypatch.setattr(sink.registry, "resolve", lambda sink_id: process)
+    response = client.post(
+        "/sink/async_sink",
+        content=b'{"event_data": {"amount": 123456789012345678901234567890}, "properties": {}}',
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    assert b'"echo":123456789012345678901234567890' in response.content
+
+
+def test_non_object_body_returns_422():
+    response = client.post("/sink/logging_sink", json=[1, 2, 3])
+    assert response.status_code == 422
@@ -0,0 +1,154 @@
+import socket
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from sinks import syslog_sink
+
+EVENT = {"eventId": "e1", "eventType": "audit.test", "sourceSystem": "api"}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_sockets():
+    syslog_sink._addresses.clear()
+    syslog_sink._udp_sock = None
+    yield
+    syslog_sink._addresses.clear()
+    syslog_sink._udp_sock = None
+    for sock, _ in syslog_sink._tcp_conns.values():
+        if sock is not None:
+            sock.close()
+    syslog_sink._tcp_conns.clear()
+
+
+def test_missing_host():
+    with pytest.raises(ValueError, match="Missing required property: 'host'"):
+        syslog_sink.process(EVENT, {})
+
+
+def test_invalid_protocol():
+    with pytest.raises(ValueError, match="Invalid protocol"):
+        syslog_sink.process(EVENT, {"host": "localhost", "protocol": "sctp"})
+
+
+def test_udp_reuses_one_socket_and_resolves_once():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2)
+    port = receiver.getsockname()[1]
+    try:
+        with patch("socket.getaddrinfo", wraps=socket.getaddrinfo) as getaddrinfo:
+            for _ in range(3):
+                syslog_sink.process(EVENT, {"host": "127.0.0.1", "port": str(port)})
+        datagrams = [receiver.recv(65535) for _ in range(3)]
+    finally:
+        receiver.close()
+
+    assert getaddrinfo.call_count == 1
+    assert all(b'"eventId":"e1"' in d for d in datagrams)
+
+
+def test_broken_udp_socket_is_replaced():
+    broken = MagicMock()
+    broken.sendto.side_effect = OSError("network unreachable")
+    syslog_sink._udp_sock = broken
+
+    with pytest.raises(RuntimeError, match="Failed to send event to Syslog"):
+        syslog_sink.process(EVENT, {"host": "127.0.0.1", "port": "5140"})
+
+    broken.close.assert_called_once()
+    assert syslog_sink._udp_sock is None
+
+
+def _tcp_server():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(4)
+    server.settimeout(2)
+    return server
+
+
+def _read_lines(conn, count):
+    conn.settimeout(2)
+    buffer = b""
+    while buffer.count(b"\n") < count:
+        buffer += conn.recv(65535)
+    return buffer.splitlines()
+
+
+def test_tcp_connection_is_kept_open_across_events():
+    server = _tcp_server()
+    properties = {"host": "127.0.0.1", "port": str(server.getsockname()[1]), "protocol": "tcp"}
+    try:
+        syslog_sink.process(EVENT, properties)
+        conn, _ = server.accept()
+        syslog_sink.process(EVENT, properties)
+        lines = _read_lines(conn, 2)
+        conn.close()
+    finally:
+        server.close()
+
+    assert len(lines) == 2
+    sock, _ = syslog_sink._tcp_conns[("127.0.0.1", int(properties["port"]))]
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+
+def test_tcp_reconnects_after_the_server_closes():
+    server = _tcp_server()
+    properties = {"host": "127.0.0.1", "port": str(server.getsockname()[1]), "protocol": "tcp"}
+    try:
+        syslog_sink.process(EVENT, properties)
+        first, _ = server.accept()
+        _read_lines(first, 1)
+        first.close()
+
+        syslog_sink.process(EVENT, properties)
+        second, _ = server.accept()
+        lines = _read_lines(second, 1)
+        second.close()
+    finally:
+        server.close()
+
+    assert b'"eventId":"e1"' in lines[0]
+
+
+def test_message_is_rfc3164_framed():
+    with patch.object(syslog_sink, "send_udp") as send_udp:
+        result = syslog_sink.process(EVENT, {"host": "loghost", "facility": "LOCAL0", "severity": "ERROR",
+                                             "tag": "audit"})
+
+    message = send_udp.call_args.args[2]
+    assert message.startswith(b"<131>")
+    header, body = message.split(b" audit: ", 1)
+    assert header.endswith(socket.gethostname().encode())
+    assert body == b'{"eventId":"e1","eventType":"audit.test","sourceSystem":"api"}'
+    assert result["message_length"] == len(message)
+
+
+def test_cef_format():
+    event = dict(EVENT, extra={"action_name": "LOGIN", "action_status": "SUCCESS"})
+    assert syslog_sink.format_cef(event) == (
+        "CEF:0|Labs64|AuditFlow|1.0|audit.test|LOGIN|5|src=api act=LOGIN outcome=SUCCESS externalId=e1")
+    assert syslog_sink.format_cef({}) == (
+        "CEF:0|Labs64|AuditFlow|1.0|unknown|unknown|5|src=unknown act=unknown outcome=unknown")
+
+
+def test_format_json_keeps_integers_beyond_64_bits():
+    assert syslog_sink.format_json({"amount": 123456789012345678901234567890}) == '{"amount":123456789012345678901234567890}'
+
+
+def test_peer_closed_detects_eof_on_high_descriptors():
+    import os
+    import resource
+
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= 2000:
+        pytest.skip("needs a descriptor limit above 2000")
+    local, remote = socket.socketpair()
+    high = socket.socket(fileno=os.dup2(local.fileno(), 2000))
+    local.close()
+    try:
+        assert syslog_sink._peer_closed(high) is False
+        remote.close()
+        assert syslog_sink._peer_closed(high) is True
+    finally:
+        high.close()
@@ -1,14 +1,22 @@
+import hashlib
+import hmac
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
-import requests
 from unittest.mock import patch, MagicMock
 from sinks import webhook_sink
 
+# Deliveries with the default retry-count share this cached session
+_SESSION = webhook_sink._get_session(3)
+
+
 def test_missing_webhook_url():
     properties = {}
     with pytest.raises(ValueError, match="Missing required property: 'webhook-url'"):
         webhook_sink.process({}, properties)
 
-@patch('requests.post')
+@patch.object(_SESSION, 'post')
 def test_successful_post(mock_post):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -25,7 +33,7 @@ def test_successful_post(mock_post):
     assert result["status_code"] == 200
     mock_post.assert_called_once()
 
-@patch('requests.get')
+@patch.object(_SESSION, 'get')
 def test_successful_get(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -45,35 +53,184 @@ def test_successful_get(mock_get):
     assert result["status_code"] == 200
     mock_get.assert_called_once()
 
-@patch('requests.post')
-def test_retries_on_failure(mock_post):
-    # Setup mock to fail twice, then succeed
-    error_mock = requests.exceptions.RequestException("Connection error")
-    success_mock = MagicMock()
-    success_mock.status_code = 200
-    success_mock.elapsed.total_seconds.return_value = 0.05
-    success_mock.text = "Success"
-    
-    mock_post.side_effect = [error_mock, error_mock, success_mock]
+class _FlakyHandler(BaseHTTPRequestHandler):
+    statuses = []
+    retry_after = "0"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        status = self.statuses.pop(0)
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", self.retry_after)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
 
-    event_data = {"test": "data"}
-    properties = {"webhook-url": "http://example.com/webhook", "retry-count": "3"}
 
-    with patch('time.sleep'):  # don't actually sleep in tests
-        result = webhook_sink.process(event_data, properties)
+@pytest.fixture
+def flaky_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_on_failure(flaky_server):
+    _FlakyHandler.statuses = [503, 429, 200]
+    properties = {"webhook-url": f"http://127.0.0.1:{flaky_server.server_port}/hook", "retry-count": "3"}
+
+    with patch("urllib3.util.retry.time.sleep"):  # don't actually back off in tests
+        result = webhook_sink.process({"test": "data"}, properties)
 
     assert result["sent"] is True
+    assert result["status_code"] == 200
     assert result["attempt"] == 3
-    assert mock_post.call_count == 3
 
-@patch('requests.post')
-def test_fails_after_retries(mock_post):
-    error_mock = requests.exceptions.RequestException("Connection error")
-    mock_post.side_effect = [error_mock, error_mock, error_mock]
 
-    event_data = {"test": "data"}
-    properties = {"webhook-url": "http://example.com/webhook", "retry-count": "3"}
+def test_fails_after_retries(flaky_server):
+    _FlakyHandler.statuses = [503, 503, 503]
+    properties = {"webhook-url": f"http://127.0.0.1:{flaky_server.server_port}/hook", "retry-count": "3"}
 
-    with patch('time.sleep'):
+    with patch("urllib3.util.retry.time.sleep"):
         with pytest.raises(RuntimeError, match="Failed to send webhook"):
-            webhook_sink.process(event_data, properties)
+            webhook_sink.process({"test": "data"}, properties)
+    assert _FlakyHandler.statuses == []
+
+
+def test_retry_after_wait_is_capped(flaky_server, monkeypatch):
+    _FlakyHandler.statuses = [429, 200]
+    monkeypatch.setattr(_FlakyHandler, "retry_after", "21600")
+    properties = {"webhook-url": f"http://127.0.0.1:{flaky_server.server_port}/hook", "retry-count": "3"}
+
+    with patch("urllib3.util.retry.time.sleep") as sleep:
+        assert webhook_sink.process({"test": "data"}, properties)["sent"] is True
+    sleep.assert_called_once_with(webhook_sink.MAX_RETRY_AFTER)
+
+
+def test_client_errors_are_not_retried(flaky_server):
+    _FlakyHandler.statuses = [400, 200]
+    properties = {"webhook-url": f"http://127.0.0.1:{flaky_server.server_port}/hook", "retry-count": "3"}
+
+    with pytest.raises(RuntimeError, match="400"):
+        webhook_sink.process({"test": "data"}, properties)
+    assert _FlakyHandler.statuses == [200]
+
+def test_connections_are_pooled_across_deliveries():
+    session = webhook_sink._get_session(3)
+    assert webhook_sink._get_session(3) is session
+    adapter = session.get_adapter("https://example.com/webhook")
+    assert adapter is session.get_adapter("http://example.com/webhook")
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 2
+
+def test_sessions_are_not_evicted():
+    first = webhook_sink._get_session(3)
+    sessions = [webhook_sink._get_session(n) for n in range(20)]
+    assert webhook_sink._get_session(3) is first
+    assert len({id(s) for s in sessions}) == 20
+
+
+@patch.object(_SESSION, 'post')
+def test_signature_covers_the_exact_body_sent(mock_post):
+    mock_post.return_value = MagicMock(status_code=200, text="ok")
+
+    webhook_sink.process({"city": "München", "n": 1}, {"webhook-url": "http://example.com/webhook", "secret": "s3cr3t"})
+
+    kwargs = mock_post.call_args.kwargs
+    expected = hmac.new(b"s3cr3t", kwargs["data"], hashlib.sha256).hexdigest()
+    assert kwargs["headers"]["X-Hub-Signature-256"] == f"sha256={expected}"
+    assert kwargs["data"] == '{"city":"München","n":1}'.encode("utf-8")
+
+
+def test_generate_signature_matches_github_style():
+    expected = hmac.new(b"key", b'{"a":1}', hashlib.sha256).hexdigest()
+    assert webhook_sink.generate_signature(b'{"a":1}', b"key") == f"sha256={expected}"
+
+
+def test_flatten_dict_keeps_document_order():
+    nested = {"a": 1, "b": {"c": {"d": None}, "e": [1, "x"]}, "f": {}, "g": True}
+    assert list(webhook_sink.flatten_dict(nested).items()) == [
+        ("a", "1"), ("b.c.d", "None"), ("b.e", '[1,"x"]'), ("g", "True")]
+    deep = current = {}
+    for _ in range(2000):
+        current["n"] = current = {}
+    current["leaf"] = 1
+    assert list(webhook_sink.flatten_dict(deep).values()) == ["1"]
+
+
+@patch.object(_SESSION, 'post')
+def test_msgpack_serialization(mock_post):
+    msgspec = pytest.importorskip("msgspec")
+    mock_post.return_value = MagicMock(status_code=200, text="ok")
+    event_data = {"city": "München", "n": 1, "tags": ["a"]}
+
+    webhook_sink.process(event_data, {"webhook-url": "http://example.com/webhook",
+                                      "serialization": "msgpack", "secret": "s3cr3t"})
+
+    kwargs = mock_post.call_args.kwargs
+    assert kwargs["headers"]["Content-Type"] == "application/msgpack"
+    assert msgspec.msgpack.decode(kwargs["data"]) == event_data
+    expected = hmac.new(b"s3cr3t", kwargs["data"], hashlib.sha256).hexdigest()
+    assert kwargs["headers"]["X-Hub-Signature-256"] == f"sha256={expected}"
+
+
+def test_invalid_serialization():
+    with pytest.raises(ValueError, match="Invalid serialization 'cbor'"):
+        webhook_sink.process({}, {"webhook-url": "http://example.com/webhook", "serialization": "cbor"})
+
+
+def test_properties_are_parsed_once_per_configuration():
+    webhook_sink._build_config.cache_clear()
+    properties = {"webhook-url": "http://example.com/webhook", "secret": "key", "timeout": "5",
+                  "headers": '{"X-Tenant": "t1"}'}
+
+    first = webhook_sink._parse_config(properties)
+    assert webhook_sink._parse_config(dict(properties)) is first
+    assert webhook_sink._build_config.cache_info().misses == 1
+    assert first.secret == b"key" and first.timeout == 5
+    assert first.headers["X-Tenant"] == "t1"
+
+
+@patch.object(_SESSION, 'post')
+def test_signature_does_not_leak_into_shared_headers(mock_post):
+    mock_post.return_value = MagicMock(status_code=200, text="ok")
+    properties = {"webhook-url": "http://example.com/webhook", "secret": "key"}
+
+    webhook_sink.process({"a": 1}, properties)
+
+    assert "X-Hub-Signature-256" in mock_post.call_args.kwargs["headers"]
+    assert "X-Hub-Signature-256" not in webhook_sink._parse_config(properties).headers
+
+
+@patch.object(_SESSION, 'get')
+@patch.object(webhook_sink, 'prepare_payload')
+def test_get_signs_the_query_string_and_skips_body_serialization(prepare_payload, mock_get):
+    mock_get.return_value = MagicMock(status_code=200, text="ok")
+
+    with patch.object(webhook_sink, 'flatten_dict', wraps=webhook_sink.flatten_dict) as flatten:
+        webhook_sink.process({"a": {"b": 1}}, {"webhook-url": "http://example.com/webhook",
+                                               "method": "GET", "secret": "key"})
+
+    prepare_payload.assert_not_called()
+    assert flatten.call_count == 1
+    kwargs = mock_get.call_args.kwargs
+    assert kwargs["params"] == "a.b=1"
+    expected = hmac.new(b"key", b"a.b=1", hashlib.sha256).hexdigest()
+    assert kwargs["headers"]["X-Hub-Signature-256"] == f"sha256={expected}"
+
+
+def test_unsupported_method():
+    with pytest.raises(ValueError, match="Unsupported HTTP method: PUT"):
+        webhook_sink.process({}, {"webhook-url": "http://example.com/webhook", "method": "PUT"})
+
+
+def test_integers_beyond_64_bits_are_sent_exactly():
+    payload = webhook_sink.prepare_payload({"amount": 123456789012345678901234567890}, "application/json")
+    assert payload == b'{"amount":123456789012345678901234567890}'
+    assert webhook_sink.flatten_dict({"a": [123456789012345678901234567890]}) == {"a": "[123456789012345678901234567890]"}
@@ -62,6 +62,29 @@ def test_promotes_well_known_extra_keys_and_removes_them_from_extra():
     assert row["extra"] == {"sessionId": "sess456"}
 
 
+def test_every_promoted_key_lands_in_its_column():
+    # transform() spells the promoted columns out in its row literal; _PROMOTED filters `extra`.
+    # Both must name the same keys, or a value is silently dropped or duplicated.
+    extra = {source_key: f"value-{source_key}" for source_key in audit_clickhouse._PROMOTED}
+    row = audit_clickhouse.transform({"extra": extra})
+
+    for source_key, column in audit_clickhouse._PROMOTED.items():
+        assert row[column] == f"value-{source_key}"
+    assert row["extra"] == {}
+
+
+def test_row_reads_exactly_the_promoted_keys_from_extra():
+    read = []
+
+    class RecordingDict(dict):
+        def get(self, key, default=None):
+            read.append(key)
+            return super().get(key, default)
+
+    audit_clickhouse.transform({"extra": RecordingDict(sessionId="s")})
+    assert sorted(read) == sorted(audit_clickhouse._PROMOTED)
+
+
 def test_missing_geolocation_yields_null_coordinates_not_zero():
     # (0, 0) is a real coordinate, so absent lat/lon must be null, never 0.
     row = audit_clickhouse.transform({"eventType": "api.call", "sourceSystem": "svc"})
@@ -7,6 +7,13 @@ def test_get_log_level():
     assert audit_loki.get_log_level("FAILURE") == "ERROR"
     assert audit_loki.get_log_level("PENDING") == "WARN"
     assert audit_loki.get_log_level("unknown") == "UNKNOWN"
+    assert audit_loki.get_log_level("success") == "INFO"
+
+def test_get_log_level_is_cached():
+    audit_loki.get_log_level.cache_clear()
+    audit_loki.get_log_level("SUCCESS")
+    audit_loki.get_log_level("SUCCESS")
+    assert audit_loki.get_log_level.cache_info().hits == 1
 
 def test_transform_basic_event():
     input_data = {
@@ -74,3 +81,22 @@ def test_transform_empty_event():
     val_dict = values[2]
     assert val_dict["eventId"] == "N/A"
     assert val_dict["level"] == "UNKNOWN"
+
+@pytest.mark.parametrize("timestamp", [
+    "2025-07-04T10:00:00Z",
+    "1999-12-31T23:59:59Z",
+    "2024-02-29T00:00:00Z",
+    "2025-07-04T12:00:00+02:00",
+])
+def test_timestamp_fast_path_matches_fromisoformat(timestamp):
+    dt_object = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    assert audit_loki._iso_to_nanos(timestamp) == str(int(dt_object.timestamp() * 1_000_000_000))
+
+def test_fractional_seconds_are_exact_nanoseconds():
+    assert audit_loki._iso_to_nanos("2025-07-04T10:00:00.250Z") == "1751623200250000000"
+    assert audit_loki._iso_to_nanos("2025-07-04T10:00:00.123456789Z") == "1751623200123456789"
+    assert audit_loki._iso_to_nanos("2025-07-04T12:00:00.000001+02:00") == "1751623200000001000"
+
+@pytest.mark.parametrize("timestamp", ["2025-13-04T10:00:00Z", "2025-02-29T10:00:00Z", "2025-07-04T10:00:6xZ", "not a timestamp"])
+def test_invalid_timestamp_falls_back_to_zero(timestamp):
+    assert audit_loki._iso_to_nanos(timestamp) == "0"
@@ -0,0 +1,39 @@
+from transformers import audit_opensearch
+
+
+def test_transform_full_event():
+    input_data = {
+        "timestamp": "2025-07-04T10:00:00Z",
+        "eventId": "fedcba98-7654-3210-fedc-ba9876543210",
+        "eventType": "audit.action.performed",
+        "sourceSystem": "system-name/service-name",
+        "tenantId": "tenant-001",
+        "geolocation": {"lat": 48.1351, "lon": 11.5820, "city": "Munich", "region": "Bavaria",
+                        "country": "Germany", "countryCode": "DE"},
+        "extra": {"userId": "user123", "browser": "Chrome", "action_name": "LOGIN_SUCCESS",
+                  "action_status": "SUCCESS", "action_message": "User logged in successfully"},
+    }
+
+    result = audit_opensearch.transform(input_data)
+
+    assert list(result) == [
+        "timestamp", "event_id", "event_type", "source_system", "tenant_id",
+        "action_name", "action_status", "action_message", "location",
+        "location_city", "location_region", "location_country", "location_country_code", "extra",
+    ]
+    assert result["location"] == {"lat": 48.1351, "lon": 11.5820}
+    assert result["extra"] == {"userId": "user123", "browser": "Chrome"}
+
+
+def test_absent_fields_are_omitted():
+    result = audit_opensearch.transform({
+        "eventId": "e1",
+        "geolocation": {"lat": 0.0, "city": "Nowhere"},
+        "extra": {"action_name": "X"},
+    })
+
+    assert result == {"event_id": "e1", "action_name": "X", "location_city": "Nowhere"}
+
+
+def test_missing_nested_objects():
+    assert audit_opensearch.transform({"eventId": "e1", "geolocation": None}) == {"event_id": "e1"}
@@ -87,3 +87,14 @@ def test_reload_picks_up_new_plugin(plugin_dir):
     _write(plugin_dir, "late_plugin", "def run(x):\n    return x\n")
     registry.reload()
     assert "late_plugin" in [p["id"] for p in registry.list_available()]
+
+
+def test_views_are_memoized_until_rediscovery(plugin_dir):
+    _write(plugin_dir, "good_plugin", "def run(x):\n    return x\n")
+    registry = _registry(plugin_dir)
+    details = registry.details()
+    assert registry.details() is details
+    assert registry.list_available() is registry.list_available()
+
+    registry.reload()
+    assert registry.details() is not details
@@ -42,3 +42,88 @@ def test_registry_reload():
     response = client.post("/registry/reload")
     assert response.status_code == 200
     assert response.json()["reloaded"] is True
+
+
+def test_async_transformer_is_awaited(monkeypatch):
+    async def transform(input_data):
+        return {"echo": input_data["eventId"]}
+
+    monkeypatch.setattr(transformer.registry, "resolve", lambda transformer_id: transform)
+    response = client.post("/transform/async_transformer", json={"eventId": "abc"})
+    assert response.status_code == 200
+    assert response.json() == {"echo": "abc"}
+
+
+def test_invalid_json_body_returns_422():
+    response = client.post("/transform/zero", content=b"{not json",
+                           headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+
+
+def test_non_object_body_returns_422():
+    response = client.post("/transform/zero", json=[1, 2, 3])
+    assert response.status_code == 422
+
+
+def test_response_is_compact_utf8_json():
+    payload = {"eventId": "e1", "extra": {"city": "München"}}
+    response = client.post("/transform/zero", json=payload)
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == '{"eventId":"e1","extra":{"city":"München"}}'.encode("utf-8")
+
+
+def test_batch_streams_a_json_array_in_order():
+    events = [{"eventId": f"e{i}", "extra": {"city": "München"}} for i in range(3)]
+    response = client.post("/transform/zero/batch", json=events)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == events
+
+
+def test_batch_of_nothing_is_an_empty_array():
+    response = client.post("/transform/zero/batch", json=[])
+    assert response.status_code == 200
+    assert response.content == b"[]"
+
+
+def test_batch_awaits_async_transformers(monkeypatch):
+    async def transform(input_data):
+        return {"echo": input_data["eventId"]}
+
+    monkeypatch.setattr(transformer.registry, "resolve", lambda transformer_id: transform)
+    response = client.post("/transform/async_transformer/batch", json=[{"eventId": "a"}, {"eventId": "b"}])
+    assert response.json() == [{"echo": "a"}, {"echo": "b"}]
+
+
+def test_batch_rejects_non_array_and_unknown_ids():
+    assert client.post("/transform/zero/batch", json={"eventId": "a"}).status_code == 422
+    assert client.post("/transform/zero/batch", json=[1, 2]).status_code == 422
+    assert client.post("/transform/definitely_not_a_real_transformer/batch", json=[]).status_code == 404
+    assert client.post("/transform/bad-id/batch", json=[]).status_code == 400
+
+
+def test_batch_failure_keeps_the_array_valid(monkeypatch):
+    def transform(input_data):
+        if input_data["eventId"] == "bad":
+            raise KeyError("action")
+        return {"echo": input_data["eventId"]}
+
+    monkeypatch.setattr(transformer.registry, "resolve", lambda transformer_id: transform)
+    response = client.post("/transform/flaky/batch", json=[{"eventId": "a"}, {"eventId": "bad"}, {"eventId": "c"}])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0] == {"echo": "a"} and results[2] == {"echo": "c"}
+    assert results[1]["transformError"]["index"] == 1
+    assert results[1]["transformError"]["eventId"] == "bad"
+
+
+def test_integers_beyond_64_bits_stay_exact():
+    body = b'{"eventId":"e1","amount":123456789012345678901234567890}'
+    response = client.post("/transform/zero", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 200
+    assert response.content == body
+
+    response = client.post("/transform/zero/batch", content=b"[" + body + b"]",
+                           headers={"Content-Type": "application/json"})
+    assert response.content == b"[" + body + b"]"
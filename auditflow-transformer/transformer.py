@@ -1,8 +1,12 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import inspect
+import json
+import re
 import sys
 import os
 import logging
+import orjson
 
 from contextlib import asynccontextmanager
 from plugin_registry import PluginRegistry, PluginNotFoundError, VALID_ID
@@ -12,6 +16,34 @@ from health import set_ready, health, readiness, liveness, service_info, suppres
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 app_logger = logging.getLogger(__name__)
 
+
+# orjson turns integers outside 64 bits into floats. Any run of 19+ digits may be such a number;
+# bodies containing one are decoded with the stdlib parser instead, which keeps them exact.
+_LONG_DIGITS = re.compile(rb'\d{19,}')
+
+
+def _loads(body: bytes):
+    """Decode a JSON body with orjson, falling back to json.loads where orjson would lose precision."""
+    if _LONG_DIGITS.search(body):
+        return json.loads(body)
+    return orjson.loads(body)
+
+
+def _dumps(content) -> bytes:
+    """Encode with orjson, falling back to json.dumps for values it rejects (e.g. integers beyond 64 bits)."""
+    try:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson (FastAPI's own ORJSONResponse is deprecated)."""
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Set service as ready after startup completes."""
@@ -34,7 +66,8 @@ app = FastAPI(
         "url": "https://raw.githubusercontent.com/Labs64/labs64.io-auditflow/refs/heads/master/LICENSE",
     },
     swagger_ui_parameters={"displayRequestDuration": True},
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=OrjsonResponse
 )
 
 # Health check endpoints
@@ -75,10 +108,58 @@ registry = PluginRegistry(
 ).discover()
 
 
-@app.post('/transform/{transformer_id}')
+TRANSFORM_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "object", "description": "AuditFlow event to transform"},
+            },
+        },
+    },
+}
+
+
+def _resolve_transformer(transformer_id: str):
+    """
+    Resolve against the allow-list: a hit is a single dict lookup, and nothing is ever
+    imported here. Only on a miss is the id checked, so malformed ids (path traversal /
+    arbitrary import) return 400 and unknown ones 404.
+    """
+    try:
+        return registry.resolve(transformer_id)
+    except PluginNotFoundError:
+        if not VALID_ID.fullmatch(transformer_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid transformer ID '{transformer_id}'. Only alphanumeric characters and underscores are allowed."
+            )
+        raise HTTPException(
+            status_code=404,
+            detail=f"Transformer '{transformer_id}' is not available. "
+                   f"See GET /transformers for the registered transformers."
+        )
+
+
+async def _read_json(request: Request):
+    """Decode the raw body once (orjson unless it holds integers beyond 64 bits); invalid JSON returns 422."""
+    try:
+        return _loads(await request.body())
+    except ValueError as e:  # orjson.JSONDecodeError and json.JSONDecodeError both subclass it
+        raise HTTPException(status_code=422, detail=f"Request body is not valid JSON: {e}")
+
+
+async def _apply(transformation_function, json_data: dict):
+    """Run a transformer, awaiting it when it is defined as 'async def transform'."""
+    if inspect.iscoroutinefunction(transformation_function):
+        return await transformation_function(json_data)
+    return transformation_function(json_data)
+
+
+@app.post('/transform/{transformer_id}', openapi_extra=TRANSFORM_REQUEST_SCHEMA)
 async def transform(
         transformer_id: str,
-        json_data: dict
+        request: Request
 ):
     """
     Transforms Labs64.IO AuditFlow JSON structures based on a transformer ID.
@@ -86,33 +167,27 @@ async def transform(
     The transformer is resolved from the startup allow-list (modules shipped in 'transformers/'
     or mounted in 'transformers_bootstrap/'). An id that is not on the allow-list returns 404 and
     is never imported. The JSON payload contains the data to be transformed.
+
+    The raw body is decoded once with orjson instead of going through FastAPI's generic 'dict'
+    validation; a body that is not a JSON object returns 422.
+
+    A transformer may define 'async def transform' (e.g. to enrich events from a network
+    lookup); it is awaited so concurrent events overlap instead of blocking the loop.
     """
     try:
-        # Reject malformed ids (path traversal / arbitrary import) with 400 before resolving.
-        if not VALID_ID.fullmatch(transformer_id):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid transformer ID '{transformer_id}'. Only alphanumeric characters and underscores are allowed."
-            )
+        transformation_function = _resolve_transformer(transformer_id)
+        json_data = await _read_json(request)
+        if not isinstance(json_data, dict):
+            raise HTTPException(status_code=422, detail="Request body must be a JSON object")
 
-        # Resolve against the allow-list. Unknown ids return 404 and never trigger an import.
-        try:
-            transformation_function = registry.resolve(transformer_id)
-        except PluginNotFoundError:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Transformer '{transformer_id}' is not available. "
-                       f"See GET /transformers for the registered transformers."
-            )
-
-        # Apply the transformation, passing the automatically parsed json_data
+        # Apply the transformation, passing the parsed json_data
         event_id = json_data.get("eventId", "unknown")
         app_logger.info("Processing event '%s' type='%s' through transformer '%s'",
                         event_id, json_data.get("eventType", ""), transformer_id)
-        transformed_data = transformation_function(json_data)
+        transformed_data = await _apply(transformation_function, json_data)
         business_telemetry.transformation_completed(transformer_id, True)
 
-        return JSONResponse(content=transformed_data, status_code=200)
+        return OrjsonResponse(content=transformed_data, status_code=200)
 
     except HTTPException as http_exc:
         # Re-raise HTTPException to be handled by FastAPI's error handling
@@ -126,10 +201,76 @@ async def transform(
         )
 
 
+TRANSFORM_BATCH_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {"type": "object", "description": "AuditFlow event to transform"},
+                },
+            },
+        },
+    },
+}
+
+
+@app.post('/transform/{transformer_id}/batch', openapi_extra=TRANSFORM_BATCH_REQUEST_SCHEMA,
+          response_class=StreamingResponse)
+async def transform_batch(
+        transformer_id: str,
+        request: Request
+):
+    """
+    Transforms a JSON array of AuditFlow events with one transformer and streams the results
+    back as a JSON array, in input order.
+
+    Each result is encoded with orjson and written as soon as it is ready, so transformed output
+    is never accumulated and the first result goes out before the last event is transformed. The
+    request body itself is still read and parsed in full, so memory grows with the input batch.
+    The id and the body shape are validated up front (400/404/422 as for a single event).
+
+    Partial failure: the status is sent before any event is transformed, so the response is
+    always 200 and the array is always complete. An event whose transformation fails is replaced,
+    at its position, by {"transformError": {"index": <position>, "eventId": <id or null>,
+    "detail": <message>}}; clients detect failures by checking each element for that key.
+    """
+    transformation_function = _resolve_transformer(transformer_id)
+    events = await _read_json(request)
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON array of objects")
+
+    app_logger.info("Processing batch of %d events through transformer '%s'", len(events), transformer_id)
+    return StreamingResponse(_stream_json_array(transformer_id, transformation_function, events),
+                             media_type="application/json")
+
+
+async def _stream_json_array(transformer_id: str, transformation_function, events: list):
+    """Yield '[', the comma-separated orjson encoding of each transformed event, then ']'."""
+    separator = b'['
+    for index, event in enumerate(events):
+        try:
+            transformed_data = await _apply(transformation_function, event)
+            chunk = _dumps(transformed_data)
+        except Exception as e:
+            app_logger.error("Transformer '%s' failed on event '%s' mid-batch: %s",
+                             transformer_id, event.get("eventId", "unknown"), e, exc_info=True)
+            business_telemetry.transformation_completed(transformer_id, False)
+            # Keep the array valid: the failed event's slot carries the error instead
+            chunk = orjson.dumps({"transformError": {
+                "index": index, "eventId": event.get("eventId"), "detail": str(e)}})
+        else:
+            business_telemetry.transformation_completed(transformer_id, True)
+        yield separator + chunk
+        separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
 @app.get('/registry')
 async def registry_details():
     """Detailed registry view: per-transformer version, description, and documented properties. Also doubles as the container healthcheck."""
-    return JSONResponse(
+    return OrjsonResponse(
         content={"transformers": registry.details(), "errors": registry.errors()},
         status_code=200
     )
@@ -139,7 +280,7 @@ async def registry_details():
 async def registry_reload():
     """Re-scan the transformer directories (hot-reload of newly mounted bootstrap modules)."""
     registry.reload()
-    return JSONResponse(
+    return OrjsonResponse(
         content={"reloaded": True, "count": len(registry.list_available()), "errors": registry.errors()},
         status_code=200
     )
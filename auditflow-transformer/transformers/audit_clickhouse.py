@@ -48,15 +48,8 @@ _PROMOTED = {
     "userId": "user_id",
 }
 
-_GEO = {
-    "countryCode": "geo_country_code",
-    "country": "geo_country",
-    "region": "geo_region",
-    "city": "geo_city",
-}
-
 
-def _stringify(value):
+def _stringify(value: object) -> str:
     """Map(String, String) values must all be strings; JSON-encode anything that is not scalar."""
     if isinstance(value, str):
         return value
@@ -74,6 +67,11 @@ def transform(input_data: dict) -> dict:
     extra = input_data.get("extra") or {}
     timestamp = input_data.get("timestamp")
 
+    extra_get = extra.get
+    geo_get = geolocation.get
+
+    # One literal: CPython presizes the table instead of growing it key by key.
+    # The extra_get keys must match _PROMOTED, which filters them out of "extra" below.
     row = {
         "timestamp": timestamp,
         # eventTime is the client-supplied action time; fall back to server receipt time.
@@ -83,22 +81,24 @@ def transform(input_data: dict) -> dict:
         "event_type": input_data.get("eventType"),
         "source_system": input_data.get("sourceSystem"),
         "tenant_id": input_data.get("tenantId"),
+        "action_name": extra_get("action_name"),
+        "action_status": extra_get("action_status"),
+        "action_message": extra_get("action_message"),
+        "user_id": extra_get("userId"),
+        "geo_country_code": geo_get("countryCode"),
+        "geo_country": geo_get("country"),
+        "geo_region": geo_get("region"),
+        "geo_city": geo_get("city"),
     }
 
-    for source_key, column in _PROMOTED.items():
-        row[column] = extra.get(source_key)
-
-    for source_key, column in _GEO.items():
-        row[column] = geolocation.get(source_key)
-
     # Omit absent scalars so ClickHouse applies the column DEFAULT via
     # input_format_defaults_for_omitted_fields. Emitting null would fail a non-Nullable column.
     row = {key: value for key, value in row.items() if value is not None}
 
     # geo_lat/geo_lon are Nullable(Float64): (0, 0) is a real coordinate, so "missing" cannot be
     # encoded as zero. Always emitted, explicitly null when absent.
-    row["geo_lat"] = geolocation.get("lat")
-    row["geo_lon"] = geolocation.get("lon")
+    row["geo_lat"] = geo_get("lat")
+    row["geo_lon"] = geo_get("lon")
 
     row["extra"] = {
         key: _stringify(value) for key, value in extra.items() if key not in _PROMOTED
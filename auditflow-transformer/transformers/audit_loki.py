@@ -1,5 +1,7 @@
 """Loki transformer: reshapes an AuditFlow event into a Grafana Loki push payload."""
+import calendar
 from datetime import datetime
+from functools import lru_cache
 
 __version__ = "1.0.0"
 
@@ -11,13 +13,72 @@ status_to_level_mapping = {
     "PENDING": "WARN"
 }
 
-def get_log_level(status):
+@lru_cache(maxsize=16)
+def get_log_level(status: str) -> str:
     """
-    Maps a status string to a log level string.
+    Maps a status string to a log level string. Cached: statuses come from a tiny set, so the
+    upper() copy and the mapping lookup run once per distinct value.
     """
     return status_to_level_mapping.get(status.upper(), "UNKNOWN")
 
-def transform(input_data):
+# Days per month for range checks in the fast parser (February is adjusted for leap years)
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def iso_to_unix_ns(timestamp_iso: str):
+    """
+    Parses the canonical UTC form 'YYYY-MM-DDTHH:MM:SS[.fffffffff]Z' straight into integer
+    Unix nanoseconds: fixed-position digit slices and calendar.timegm, no datetime object and
+    no float round-trip. Returns None for any other shape or an out-of-range field.
+    """
+    length = len(timestamp_iso)
+    if (length < 20 or timestamp_iso[-1] != 'Z' or timestamp_iso[10] != 'T'
+            or timestamp_iso[4] != '-' or timestamp_iso[7] != '-'
+            or timestamp_iso[13] != ':' or timestamp_iso[16] != ':'):
+        return None
+    if length == 20:
+        fraction = 0
+    elif 22 <= length <= 30 and timestamp_iso[19] == '.':
+        fraction_digits = timestamp_iso[20:-1]
+        if not (fraction_digits.isascii() and fraction_digits.isdigit()):
+            return None
+        fraction = int(fraction_digits.ljust(9, '0'))
+    else:
+        return None
+
+    digits = (timestamp_iso[0:4] + timestamp_iso[5:7] + timestamp_iso[8:10]
+              + timestamp_iso[11:13] + timestamp_iso[14:16] + timestamp_iso[17:19])
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+    hour, minute, second = int(digits[8:10]), int(digits[10:12]), int(digits[12:14])
+    # timegm silently rolls over out-of-range fields, so validate them first
+    if not 1 <= month <= 12 or hour > 23 or minute > 59 or second > 59:
+        return None
+    if not 1 <= day <= (29 if month == 2 and calendar.isleap(year) else _DAYS_IN_MONTH[month]):
+        return None
+    return calendar.timegm((year, month, day, hour, minute, second)) * 1_000_000_000 + fraction
+
+@lru_cache(maxsize=4096)
+def _iso_to_nanos(timestamp_iso: str) -> str:
+    """
+    Converts an ISO-8601 timestamp to Unix nanoseconds as a string ("0" if unparseable).
+
+    The canonical UTC form goes through iso_to_unix_ns; anything else (offsets, naive times)
+    falls back to fromisoformat. Bursts of events share timestamps, so results are cached.
+    """
+    nanos = iso_to_unix_ns(timestamp_iso)
+    if nanos is not None:
+        return str(nanos)
+    try:
+        dt_object = datetime.fromisoformat(timestamp_iso.replace('Z', '+00:00'))
+        # Whole seconds from timestamp() (exact as a float) plus integer microseconds: no float
+        # rounding of the fraction. Naive values keep timestamp()'s local-time interpretation.
+        seconds = int(dt_object.replace(microsecond=0).timestamp())
+        return str(seconds * 1_000_000_000 + dt_object.microsecond * 1_000)
+    except ValueError:
+        return "0"
+
+def transform(input_data: dict) -> dict:
     """
     Transforms a Labs64.IO AuditFlow JSON structure into a Loki-compatible payload.
 
@@ -79,43 +140,41 @@ def transform(input_data):
       ]
     }
     """
-    geolocation = input_data.get('geolocation', {})
-    extra = input_data.get('extra', {})
+    # Bind the lookups once; each is called several times below
+    input_get = input_data.get
+    extra_get = (input_get('extra') or {}).get
+    geo_get = (input_get('geolocation') or {}).get
+    action_status = extra_get("action_status", "N/A")
 
     # Prepare the "stream" object based on the desired output structure
     stream_data = {
         "job": "auditflow",
-        "service_name": input_data.get("sourceSystem", "unknown"),
-        "tenant_id": input_data.get("tenantId", "unknown"),
-        "event_type": input_data.get("eventType", "unknown"),
-        "action_name": extra.get("action_name", "unknown_action"),
-        "action_status": extra.get("action_status", "unknown_status"),
+        "service_name": input_get("sourceSystem", "unknown"),
+        "tenant_id": input_get("tenantId", "unknown"),
+        "event_type": input_get("eventType", "unknown"),
+        "action_name": extra_get("action_name", "unknown_action"),
+        "action_status": extra_get("action_status", "unknown_status"),
     }
 
     # Prepare the nested dictionary for the "values" array
     values_dict = {
-        "eventId": input_data.get("eventId", "N/A"),
-        "level": get_log_level(extra.get("action_status", "N/A")),
-        "userId": extra.get("userId", "N/A"),
-        "country_code": geolocation.get("countryCode", "N/A"),
-        "latitude": f'{geolocation.get("lat", "N/A")}',
-        "longitude": f'{geolocation.get("lon", "N/A")}',
+        "eventId": input_get("eventId", "N/A"),
+        "level": get_log_level(action_status),
+        "userId": extra_get("userId", "N/A"),
+        "country_code": geo_get("countryCode", "N/A"),
+        # Loki structured metadata values must be strings; str() formats a float faster than f''
+        "latitude": str(geo_get("lat", "N/A")),
+        "longitude": str(geo_get("lon", "N/A")),
     }
 
     # Prepare the "values" array
     # The timestamp needs to be a string in Unix nanoseconds
-    timestamp_iso = input_data.get("timestamp")
-    unix_nano_timestamp = "0"
-    if timestamp_iso:
-        try:
-            dt_object = datetime.fromisoformat(timestamp_iso.replace('Z', '+00:00'))
-            unix_nano_timestamp = str(int(dt_object.timestamp() * 1_000_000_000))
-        except ValueError:
-            pass
+    timestamp_iso = input_get("timestamp")
+    unix_nano_timestamp = _iso_to_nanos(timestamp_iso) if timestamp_iso else "0"
 
     values_data = [
         unix_nano_timestamp,
-        extra.get("action_message", "N/A"),
+        extra_get("action_message", "N/A"),
         values_dict
     ]
 
@@ -4,6 +4,8 @@ __version__ = "1.0.0"
 
 PROPERTIES = {}
 
+_ACTION_KEYS = frozenset({'action_name', 'action_status', 'action_message'})
+
 
 def transform(input_data: dict) -> dict:
     """
@@ -64,49 +66,36 @@ def transform(input_data: dict) -> dict:
       }
     }
     """
-    transformed_data = {}
-
-    geolocation = input_data.get('geolocation', {})
-    extra = input_data.get('extra', {})
-
-    # Top-level fields (previously in MetaInfo)
-    transformed_data['timestamp'] = input_data.get('timestamp')
-    transformed_data['event_id'] = input_data.get('eventId')
-    transformed_data['event_type'] = input_data.get('eventType')
-    transformed_data['source_system'] = input_data.get('sourceSystem')
-    transformed_data['tenant_id'] = input_data.get('tenantId')
-
-    # Action fields (now in extra) — only include if present
-    if extra.get('action_name') is not None:
-        transformed_data['action_name'] = extra.get('action_name')
-    if extra.get('action_status') is not None:
-        transformed_data['action_status'] = extra.get('action_status')
-    if extra.get('action_message') is not None:
-        transformed_data['action_message'] = extra.get('action_message')
+    # Bind the lookups once; each is called several times below
+    input_get = input_data.get
+    geolocation = input_get('geolocation') or {}
+    extra = input_get('extra') or {}
+    extra_get = extra.get
+    geo_get = geolocation.get
+    lat = geo_get('lat')
+    lon = geo_get('lon')
 
-    # Geolocation fields - Combined for OpenSearch geo_point
-    if geolocation and geolocation.get('lat') is not None and geolocation.get('lon') is not None:
-        transformed_data['location'] = {
-            "lat": geolocation['lat'],
-            "lon": geolocation['lon']
-        }
-
-    # Retain other geolocation descriptive fields for filtering/display (only if present)
-    for key, field in [
-        ('location_city', 'city'),
-        ('location_region', 'region'),
-        ('location_country', 'country'),
-        ('location_country_code', 'countryCode'),
-    ]:
-        value = geolocation.get(field)
-        if value is not None:
-            transformed_data[key] = value
-
-    # Extra — keep as a nested object, but strip the action fields already promoted above
-    _ACTION_KEYS = {'action_name', 'action_status', 'action_message'}
-    remaining_extra = {k: v for k, v in extra.items() if k not in _ACTION_KEYS}
-    if remaining_extra:
-        transformed_data['extra'] = remaining_extra
+    # Built as one literal; absent (None) values are dropped in a single pass at the end.
+    transformed_data = {
+        # Top-level fields (previously in MetaInfo)
+        'timestamp': input_get('timestamp'),
+        'event_id': input_get('eventId'),
+        'event_type': input_get('eventType'),
+        'source_system': input_get('sourceSystem'),
+        'tenant_id': input_get('tenantId'),
+        # Action fields (now in extra)
+        'action_name': extra_get('action_name'),
+        'action_status': extra_get('action_status'),
+        'action_message': extra_get('action_message'),
+        # Geolocation fields - Combined for OpenSearch geo_point
+        'location': {"lat": lat, "lon": lon} if lat is not None and lon is not None else None,
+        # Other geolocation descriptive fields for filtering/display
+        'location_city': geo_get('city'),
+        'location_region': geo_get('region'),
+        'location_country': geo_get('country'),
+        'location_country_code': geo_get('countryCode'),
+        # Extra — kept as a nested object, minus the action fields promoted above
+        'extra': {k: v for k, v in extra.items() if k not in _ACTION_KEYS} or None,
+    }
 
-    # Drop any remaining None values from the top-level output
     return {k: v for k, v in transformed_data.items() if v is not None}